@@ -0,0 +1,154 @@
+"""
+Atrapa MainWindow do benchmarków i uruchomień bez ekranu.
+
+Odtwarza tylko tę część interfejsu, której używa MainWindowGUIAutomator
+(artykul_frame, wlasciwosci_table, nadruk_frame, pakowanie_frame, podpisy_frame)
+i liczy wywołania, żeby dało się porównać koszt wypełniania formularza.
+"""
+from collections import Counter
+from tkinter import filedialog
+from types import SimpleNamespace
+from typing import Dict, Tuple
+
+# Domyślne wiersze tabeli właściwości po _new_karta (Lp., Parametr, Metoda, Wartość, Jednostka, Odchylenie)
+DEFAULT_PROPERTIES = [
+    ("Weight", "PN-81/P 50129", "", "g/m²", "-15 +15 %"),
+    ("Thickness", "PN-ISO 4593", "", "μm", "-10 +10 %"),
+    ("Tensile strength", "PN-EN ISO 527", "", "MPa", "- -"),
+    ("Elongation at break", "PN-EN ISO 527", "", "%", "- -"),
+    ("COF", "PN-EN ISO 8295", "", "-", "- -"),
+]
+
+ARTYKUL_FIELDS = ["Nr karty", "Artykuł indeks", "Artykuł klienta", "Artykuł nazwa"]
+PAKOWANIE_FIELDS = ["Kod nawoju", "Tuleja wewnętrzna", "Średnica nawoju", "Szerokość tulei", "Wysunięcie tulei"]
+
+
+class FakeWidget:
+    """Entry / Spinbox / Combobox / StringVar w jednym - insert, delete, get, set"""
+
+    def __init__(self, calls: Counter):
+        self.value = ""
+        self._calls = calls
+
+    def insert(self, index, text) -> None:
+        self._calls["widget_write"] += 1
+        index = len(self.value) if index == "end" else int(index)
+        self.value = self.value[:index] + str(text) + self.value[index:]
+
+    def delete(self, first, last=None) -> None:
+        self._calls["widget_write"] += 1
+        self.value = ""
+
+    def set(self, value) -> None:
+        self._calls["widget_write"] += 1
+        self.value = str(value)
+
+    def get(self) -> str:
+        return self.value
+
+
+class FakeTreeview:
+    """Podzbiór API ttk.Treeview: get_children, item, insert, delete"""
+
+    def __init__(self, calls: Counter):
+        self._rows: Dict[str, Tuple[str, ...]] = {}
+        self._next_id = 0
+        self._calls = calls
+
+    def get_children(self, item: str = "") -> Tuple[str, ...]:
+        self._calls["tree_get_children"] += 1
+        return tuple(self._rows)
+
+    def item(self, item: str, option=None, **kw):
+        if "values" in kw:
+            self._calls["tree_write"] += 1
+            self._rows[item] = tuple(str(v) for v in kw["values"])
+            return None
+        self._calls["tree_read"] += 1
+        if option == "values":
+            return self._rows[item]
+        return {"values": self._rows[item]}
+
+    def insert(self, parent: str, index, values=()) -> str:
+        self._calls["tree_write"] += 1
+        self._next_id += 1
+        item = f"I{self._next_id:03X}"
+        self._rows[item] = tuple(str(v) for v in values)
+        return item
+
+    def delete(self, *items: str) -> None:
+        for item in items:
+            self._calls["tree_write"] += 1
+            del self._rows[item]
+
+
+class FakeRoot:
+    def __init__(self):
+        self.withdrawn = False
+
+    def title(self, text=None) -> str:
+        return "Karta specyfikacji"
+
+    def withdraw(self) -> None:
+        self.withdrawn = True
+
+    def deiconify(self) -> None:
+        self.withdrawn = False
+
+    def after(self, ms, callback=None, *args):
+        if callback is not None:
+            callback(*args)
+
+    def update_idletasks(self) -> None:
+        pass
+
+
+class FakeMainWindow:
+    """Atrapa MainWindow - zapisuje się w calls, _generate_pdf tworzy mały plik"""
+
+    def __init__(self, properties_rows: int = len(DEFAULT_PROPERTIES)):
+        self.calls = Counter()
+        self.properties_rows = properties_rows
+        self.root = FakeRoot()
+        self.generated = []
+        self._new_karta()
+
+    def _new_karta(self) -> None:
+        calls = self.calls
+        calls["new_karta"] += 1
+
+        self.artykul_frame = SimpleNamespace(
+            fields={name: FakeWidget(calls) for name in ARTYKUL_FIELDS},
+            layer1_var=FakeWidget(calls),
+            layer2_var=FakeWidget(calls),
+            thickness1_var=FakeWidget(calls),
+            thickness2_var=FakeWidget(calls),
+            _update_structure_fields=lambda: calls.update(["update_structure"]),
+        )
+
+        tree = FakeTreeview(calls)
+        for lp in range(self.properties_rows):
+            name, method, value, unit, deviation = DEFAULT_PROPERTIES[lp % len(DEFAULT_PROPERTIES)]
+            if lp >= len(DEFAULT_PROPERTIES):
+                name = f"{name} #{lp}"
+            tree.insert("", "end", values=[str(lp + 1), name, method, value, unit, deviation])
+        self.wlasciwosci_table = SimpleNamespace(tree=tree)
+
+        self.nadruk_frame = SimpleNamespace(
+            ilosc_kolorow_spin=FakeWidget(calls),
+            fields={"Lakier": FakeWidget(calls)},
+            warstwa_combo=FakeWidget(calls),
+            typ_combo=FakeWidget(calls),
+            symetria_combo=FakeWidget(calls),
+        )
+        self.pakowanie_frame = SimpleNamespace(fields={name: FakeWidget(calls) for name in PAKOWANIE_FIELDS})
+        self.podpisy_frame = SimpleNamespace(opracowal_combo=FakeWidget(calls))
+
+    def _generate_pdf(self) -> None:
+        """Jak w prawdziwym programie: pyta o ścieżkę zapisu i zapisuje plik"""
+        self.calls["generate_pdf"] += 1
+        path = filedialog.asksaveasfilename(defaultextension=".pdf")
+        if path:
+            with open(path, "wb") as f:
+                f.write(b"%PDF-1.4\n% fake\n")
+            self.generated.append(path)
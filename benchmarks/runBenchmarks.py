@@ -0,0 +1,188 @@
+"""
+Benchmarki etapów przetwarzania na syntetycznym korpusie.
+
+Użycie (z katalogu repozytorium):
+    python -m benchmarks.runBenchmarks --cards 200 --output bench.json
+    python -m benchmarks.runBenchmarks --cards 200 --compare bench_poprzedni.json
+
+Wyniki (JSON) zawierają commit, parametry oraz dla każdego etapu przepustowość
+i opóźnienia (p50/p95/max), więc można je porównywać między commitami.
+"""
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from benchmarks.fakeMainWindow import FakeMainWindow
+from benchmarks.syntheticCorpus import generate_cards, generate_excel
+
+
+def measure(name: str, items: list, func: Callable, repeat: int = 1) -> Dict[str, float]:
+    """Uruchamia func(item) dla każdego elementu, repeat razy; zwraca statystyki etapu"""
+    latencies: List[float] = []
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for item in items:
+            t0 = time.perf_counter()
+            func(item)
+            latencies.append(time.perf_counter() - t0)
+    total = time.perf_counter() - started
+
+    latencies.sort()
+    result = {
+        "items": len(latencies),
+        "total_s": total,
+        "throughput_per_s": len(latencies) / total if total else 0.0,
+        "p50_ms": 1000 * statistics.median(latencies) if latencies else 0.0,
+        "p95_ms": 1000 * latencies[int(0.95 * (len(latencies) - 1))] if latencies else 0.0,
+        "max_ms": 1000 * latencies[-1] if latencies else 0.0,
+    }
+    print(f"  {name:<22} {result['throughput_per_s']:>10.1f} /s   "
+          f"p50 {result['p50_ms']:>8.2f} ms   p95 {result['p95_ms']:>8.2f} ms")
+    return result
+
+
+def run(args: argparse.Namespace) -> Dict:
+    from excelExtract import ExcelDataEnricher
+    from guiAutomator import MainWindowGUIAutomator, HeadlessGUIAutomator
+    from model import PDFTextExtractor, RegexDataParser, SinglePassDataParser, extract_and_parse
+    from streamExtractor import ContentStreamTextExtractor
+
+    work_dir = Path(args.corpus_dir or tempfile.mkdtemp(prefix="pdf_bench_"))
+    print(f"📁 Korpus: {work_dir}")
+    pdfs = generate_cards(work_dir / "cards", args.cards, args.appendix_pages, seed=args.seed)
+    excel = generate_excel(work_dir / "parametry.xlsx", args.excel_rows, cards=args.cards, seed=args.seed)
+
+    results: Dict[str, Dict[str, float]] = {}
+    print("\n⏱ Etapy:")
+
+    extractor = PDFTextExtractor()
+    texts = {}
+    results["extract"] = measure("extract", pdfs, lambda p: texts.__setitem__(p, extractor.extract_text(p)))
+
+    stream_extractor = ContentStreamTextExtractor()
+    results["extract_content_stream"] = measure("extract_content_stream", pdfs, stream_extractor.extract_text)
+    results["extract_content_stream"]["fallbacks"] = stream_extractor.fallback_count
+
+    parser = SinglePassDataParser()
+    results["extract_streaming"] = measure(
+        "extract_streaming", pdfs, lambda p: extract_and_parse(extractor, parser, p, streaming=True)
+    )
+
+    text_list = [texts[p] for p in pdfs]
+    regex_parser = RegexDataParser()
+    results["parse_regex"] = measure("parse_regex", text_list, regex_parser.parse, args.repeat)
+    results["parse_single_pass"] = measure("parse_single_pass", text_list, parser.parse, args.repeat)
+
+    parsed = [(p, parser.parse(texts[p])) for p in pdfs]
+
+    if excel is not None:
+        t0 = time.perf_counter()
+        enricher = ExcelDataEnricher(excel)
+        load_s = time.perf_counter() - t0
+        results["enrich"] = measure("enrich", parsed, lambda item: enricher.enrich(item[1], item[0].stem))
+        results["enrich"]["load_s"] = load_s
+        results["enrich_many"] = measure(
+            "enrich_many", [parsed],
+            lambda items: enricher.enrich_many([data for _, data in items], [pdf.stem for pdf, _ in items])
+        )
+        results["enrich_many"]["cards_per_s"] = len(parsed) / results["enrich_many"]["total_s"]
+    else:
+        print("  enrich                 pominięte (brak pandas/openpyxl)")
+
+    window = FakeMainWindow(properties_rows=args.properties_rows)
+    automator = MainWindowGUIAutomator(window)
+    results["fill_form"] = measure("fill_form", [data for _, data in parsed], automator.fill_form)
+    results["fill_form"]["calls_per_card"] = {
+        name: count / len(parsed) for name, count in sorted(window.calls.items())
+    } if parsed else {}
+
+    headless_window = FakeMainWindow(properties_rows=args.properties_rows)
+    headless = HeadlessGUIAutomator(headless_window, work_dir / "output")
+
+    def fill_and_generate(data) -> None:
+        headless.fill_form(data)
+        headless.generate_pdf()
+
+    results["headless_card"] = measure("headless_card", [data for _, data in parsed], fill_and_generate)
+
+    return {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "params": {
+                "cards": args.cards,
+                "appendix_pages": args.appendix_pages,
+                "excel_rows": args.excel_rows,
+                "properties_rows": args.properties_rows,
+                "repeat": args.repeat,
+                "seed": args.seed,
+            },
+        },
+        "results": results,
+    }
+
+
+def compare(current: Dict, baseline: Dict, tolerance: float) -> bool:
+    """Wypisuje zmianę przepustowości względem bazowego wyniku; False = jest regresja"""
+    ok = True
+    print(f"\n📊 Porównanie z {baseline['meta'].get('commit', '?')[:10]} (tolerancja {tolerance:.0%}):")
+    for stage, result in current["results"].items():
+        base = baseline["results"].get(stage)
+        if not base or not base.get("throughput_per_s"):
+            print(f"  {stage:<22} (brak w wyniku bazowym)")
+            continue
+        ratio = result["throughput_per_s"] / base["throughput_per_s"]
+        regression = ratio < 1 - tolerance
+        ok = ok and not regression
+        mark = "✗" if regression else "✓"
+        print(f"  {mark} {stage:<20} {ratio:>6.2f}x")
+    return ok
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmarki ekstrakcji/parsowania/Excel/GUI")
+    parser.add_argument("--cards", type=int, default=100, help="Liczba syntetycznych kart")
+    parser.add_argument("--appendix-pages", type=int, default=0, help="Strony załącznika na kartę")
+    parser.add_argument("--excel-rows", type=int, default=5000, help="Liczba wierszy arkusza Excel")
+    parser.add_argument("--properties-rows", type=int, default=5, help="Wiersze tabeli właściwości w atrapie")
+    parser.add_argument("--repeat", type=int, default=5, help="Powtórzenia szybkich etapów (parsowanie)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--corpus-dir", type=Path, help="Katalog na korpus (domyślnie tymczasowy)")
+    parser.add_argument("--output", type=Path, help="Zapis wyników JSON")
+    parser.add_argument("--compare", type=Path, help="Wynik JSON do porównania")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="Dopuszczalny spadek przepustowości")
+    args = parser.parse_args(argv)
+
+    current = run(args)
+
+    if args.output:
+        args.output.write_text(json.dumps(current, indent=2, ensure_ascii=False), encoding="utf-8")
+        print(f"\n💾 Wyniki zapisane: {args.output}")
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))
+        if not compare(current, baseline, args.tolerance):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
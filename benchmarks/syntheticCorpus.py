@@ -0,0 +1,180 @@
+"""
+Generator syntetycznych kart specyfikacji (PDF) i arkuszy Excel do benchmarków.
+
+Pliki PDF są składane ręcznie (czcionka Helvetica, bez dodatkowych zależności),
+więc działają z PDFTextExtractor tak jak prawdziwe karty.
+"""
+import random
+from pathlib import Path
+from typing import List, Optional
+
+# Szablon karty - etykiety i jednostki zgodne z RegexDataParser / UNIT_MAP
+CARD_TEMPLATE = [
+    "SPECIFICATION CARD",
+    "Card No: KS-{n:05d}/{year}",
+    "Article index: ART-{n:05d}",
+    "Client's article index: CL-{client}",
+    "Article description: Laminate film {layer1}/{layer2} {width} mm",
+    "Product structure: {layer1}/{layer2} Structure thickness: {t1} / {t2}",
+    "Structure description: {layer1} {t1} / {layer2} {t2} Chemical composition: polyamide, polyethylene",
+    "Physico-chemical properties",
+    "Gramatur/Weight g/m2 {weight}",
+    "OTR cm3/m2 d at {otr}",
+    "WVTR g/m2d {wvtr}",
+    "Grub./Thickness μm {thickness}",
+    "Print type: {print_type}",
+    "Number of colours: {colours} Solid/Lacquer: {lacquer}",
+    "Winding code: {winding} Core: {core} mm",
+    "External diameter: {diameter} mm Core submission: {submission}",
+    "Width of core: {width} mm",
+]
+
+LAYERS = ["OPA", "PET", "BOPP", "PE", "CPP", "ALU"]
+PRINT_TYPES = [
+    "sandwich printing/reverse/symmetrical",
+    "superficial/simple/asymmetrical",
+    "sandwich printing/simple/symmetrical",
+]
+
+# Kody WinAnsi + μ (U+03BC, jak w UNIT_MAP) pod kodem 0xB5 jako glif "uni03BC"
+_MU_CODE = 0xB5
+
+
+def card_lines(n: int, rnd: random.Random) -> List[str]:
+    """Linie tekstu jednej karty o numerze n"""
+    values = {
+        "n": n,
+        "year": rnd.choice([2022, 2023, 2024]),
+        "client": rnd.randint(1000, 9999),
+        "layer1": rnd.choice(LAYERS),
+        "layer2": rnd.choice(LAYERS),
+        "t1": rnd.choice([12, 15, 20, 25]),
+        "t2": rnd.choice([30, 40, 50, 60, 70]),
+        "weight": f"{rnd.uniform(40, 120):.1f}".replace(".", ","),
+        "otr": rnd.randint(1, 120),
+        "wvtr": f"{rnd.uniform(0.5, 10):.1f}".replace(".", ","),
+        "thickness": rnd.randint(40, 120),
+        "print_type": rnd.choice(PRINT_TYPES),
+        "colours": rnd.randint(1, 8),
+        "lacquer": rnd.choice(["brak", "matt", "gloss"]),
+        "winding": rnd.randint(1, 8),
+        "core": rnd.choice([76, 152]),
+        "diameter": rnd.choice([300, 400, 500]),
+        "submission": rnd.choice([0, 2, 5]),
+        "width": rnd.choice([200, 300, 420, 600]),
+    }
+    return [line.format(**values) for line in CARD_TEMPLATE]
+
+
+def _encode(text: str) -> bytes:
+    raw = bytearray()
+    for char in text:
+        if char == "μ":
+            raw.append(_MU_CODE)
+            continue
+        byte = char.encode("cp1252", errors="replace")
+        if byte in (b"(", b")", b"\\"):
+            raw += b"\\"
+        raw += byte
+    return bytes(raw)
+
+
+def _page_stream(lines: List[str]) -> bytes:
+    parts = [b"BT /F1 10 Tf 14 TL 40 800 Td"]
+    for line in lines:
+        parts.append(b"(" + _encode(line) + b") Tj T*")
+    parts.append(b"ET")
+    return b"\n".join(parts)
+
+
+def write_pdf(path: Path, pages: List[List[str]]) -> None:
+    """Zapisuje minimalny PDF: każda strona to lista linii tekstu"""
+    objects: List[bytes] = []
+
+    def add(body: bytes) -> int:
+        objects.append(body)
+        return len(objects)
+
+    catalog = add(b"")  # uzupełniane po utworzeniu stron
+    pages_obj = add(b"")
+    font = add(
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica "
+        b"/Encoding << /Type /Encoding /BaseEncoding /WinAnsiEncoding /Differences [181 /uni03BC] >> >>"
+    )
+
+    page_ids = []
+    for lines in pages:
+        stream = _page_stream(lines)
+        content = add(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        page_ids.append(add(
+            b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 595 842] "
+            b"/Resources << /Font << /F1 %d 0 R >> >> /Contents %d 0 R >>" % (pages_obj, font, content)
+        ))
+
+    objects[catalog - 1] = b"<< /Type /Catalog /Pages %d 0 R >>" % pages_obj
+    kids = b" ".join(b"%d 0 R" % page_id for page_id in page_ids)
+    objects[pages_obj - 1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(page_ids))
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        out += b"%010d 00000 n \n" % offset
+    out += b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, catalog, xref)
+
+    Path(path).write_bytes(bytes(out))
+
+
+def generate_cards(
+        output_dir: Path,
+        count: int,
+        appendix_pages: int = 0,
+        seed: int = 0
+) -> List[Path]:
+    """
+    Tworzy count kart w output_dir.
+
+    Args:
+        appendix_pages: Liczba dodatkowych stron załącznika na końcu każdej karty
+        seed: Ziarno losowania - ten sam seed daje ten sam korpus
+    """
+    rnd = random.Random(seed)
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    appendix = [f"Appendix line {i}: lorem ipsum dolor sit amet" for i in range(50)]
+    paths = []
+    for n in range(count):
+        path = output_dir / f"card_{n:05d}.pdf"
+        write_pdf(path, [card_lines(n, rnd)] + [appendix] * appendix_pages)
+        paths.append(path)
+    return paths
+
+
+def generate_excel(path: Path, rows: int, cols: int = 12, cards: int = 0, seed: int = 0) -> Optional[Path]:
+    """
+    Arkusz parametrów rows x cols z losowymi wartościami; pierwsze `cards` wierszy
+    (w losowych miejscach) zawiera nazwę pliku i indeks artykułu karty.
+    Wymaga pandas + openpyxl - bez nich zwraca None.
+    """
+    try:
+        import pandas as pd
+    except ImportError:
+        return None
+
+    rnd = random.Random(seed)
+    data = {f"param_{c}": [f"v{rnd.randint(0, rows)}" for _ in range(rows)] for c in range(cols)}
+    data["file"] = [f"other_{r}" for r in range(rows)]
+    data["article_index"] = [f"X-{r}" for r in range(rows)]
+
+    for n, row in enumerate(rnd.sample(range(rows), min(cards, rows))):
+        data["file"][row] = f"card_{n:05d}"
+        data["article_index"][row] = f"ART-{n:05d}"
+
+    pd.DataFrame(data).to_excel(path, index=False)
+    return Path(path)
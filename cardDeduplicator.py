@@ -0,0 +1,122 @@
+import csv
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+from pdfCache import file_fingerprint
+from tempDataBase import PDFData
+
+
+# Numer rewizji w nazwie pliku: "karta_rev2.pdf", "KS-001 Rev.3.pdf", "karta_v4.pdf", "karta rewizja 5.pdf"
+REVISION_PATTERN = re.compile(r"(?:rev(?:ision)?|rewizja|wersja|v)[\s._-]*(\d+)", re.IGNORECASE)
+
+
+def file_revision(pdf_path: Path) -> int:
+    """Numer rewizji z nazwy pliku (0 jeśli brak)"""
+    revisions = REVISION_PATTERN.findall(Path(pdf_path).stem)
+    return int(revisions[-1]) if revisions else 0
+
+
+@dataclass
+class DroppedCard:
+    path: Path
+    reason: str
+    kept: Path
+
+
+@dataclass
+class DedupReport:
+    """Wynik deduplikacji: zachowane pliki i lista odrzuconych z powodem"""
+    kept: List[Path] = field(default_factory=list)
+    dropped: List[DroppedCard] = field(default_factory=list)
+
+    def print_summary(self) -> None:
+        if not self.dropped:
+            return
+        print(f"\n🧹 Duplikaty: pominięto {len(self.dropped)} z {len(self.kept) + len(self.dropped)} kart")
+        for card in self.dropped:
+            print(f"  ⏭ {card.path.name}: {card.reason} (zostaje {card.kept.name})")
+
+    def export_csv(self, path: Path) -> None:
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(("dropped", "reason", "kept"))
+            for card in self.dropped:
+                writer.writerow((str(card.path), card.reason, str(card.kept)))
+
+
+class CardDeduplicator:
+    """
+    Wybór jednej karty z każdej grupy duplikatów przed etapem GUI.
+
+    1. Pliki o identycznej treści (fingerprint) - zostaje pierwszy.
+    2. Karty o tym samym kluczu (domyślnie card_no + article_index) - zostaje jedna według reguły:
+       "mtime" (najnowszy plik), "revision" (najwyższa rewizja z nazwy pliku, potem mtime)
+       albo własna funkcja (ścieżka, dane) -> wartość porównywalna, wygrywa największa.
+    Karty bez wartości klucza nie są grupowane. Zachowane karty wychodzą w kolejności wejścia.
+    """
+
+    RULES = ("mtime", "revision")
+
+    def __init__(self, rule: Union[str, Callable[[Path, PDFData], object]] = "mtime",
+                 key_fields: Sequence[str] = ("card_no", "article_index")):
+        if isinstance(rule, str) and rule not in self.RULES:
+            raise ValueError(f"Nieznana reguła deduplikacji '{rule}' (dostępne: {', '.join(self.RULES)})")
+        self.rule = rule
+        self.key_fields = tuple(key_fields)
+
+    def select(self, cards: Sequence[Tuple[Path, PDFData]],
+               fingerprints: Optional[Dict[Path, str]] = None) -> DedupReport:
+        """
+        Args:
+            cards: (plik, sparsowane dane) w kolejności przetwarzania
+            fingerprints: Znane już fingerprinty (np. z dziennika wznowienia) - reszta liczona z pliku
+        """
+        fingerprints = dict(fingerprints or {})
+        report = DedupReport()
+
+        # 1. Identyczne pliki
+        unique: List[Tuple[Path, PDFData]] = []
+        first_by_fingerprint: Dict[str, Path] = {}
+        for pdf_path, data in cards:
+            if pdf_path not in fingerprints:
+                fingerprints[pdf_path] = file_fingerprint(pdf_path)
+            first = first_by_fingerprint.setdefault(fingerprints[pdf_path], pdf_path)
+            if first is pdf_path:
+                unique.append((pdf_path, data))
+            else:
+                report.dropped.append(DroppedCard(pdf_path, "identyczny plik", first))
+
+        # 2. Ta sama karta - wybór według reguły
+        groups: Dict[tuple, List[Tuple[Path, PDFData]]] = {}
+        for pdf_path, data in unique:
+            groups.setdefault(self._key(data), []).append((pdf_path, data))
+
+        winners = set()
+        for key, members in groups.items():
+            if key is None or len(members) == 1:
+                winners.update(pdf_path for pdf_path, _ in members)
+                continue
+            best = max(members, key=lambda card: self._rank(*card))[0]
+            winners.add(best)
+            for pdf_path, _ in members:
+                if pdf_path != best:
+                    report.dropped.append(DroppedCard(pdf_path, f"starsza wersja karty {' / '.join(key)}", best))
+
+        report.kept = [pdf_path for pdf_path, _ in unique if pdf_path in winners]
+        return report
+
+    def _key(self, data: PDFData) -> Optional[tuple]:
+        values = tuple(str(getattr(data, name, "") or "").strip() for name in self.key_fields)
+        if not any(values):
+            return None
+        return values
+
+    def _rank(self, pdf_path: Path, data: PDFData):
+        if callable(self.rule):
+            return self.rule(pdf_path, data)
+        mtime = pdf_path.stat().st_mtime
+        if self.rule == "revision":
+            return file_revision(pdf_path), mtime
+        return mtime
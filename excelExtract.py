@@ -1,35 +1,124 @@
+from dataclasses import fields
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Dict, List, Sequence
 
 from interface import IDataEnricher
 from tempDataBase import PDFData
 
 
+# Pola PDFData przechowywane jako liczby (parser zwraca float albo None)
+NUMERIC_FIELDS = ("gramatura", "otr", "wvtr", "thickness")
+
+
 class ExcelDataEnricher(IDataEnricher):
     """Wzbogacanie danych z Excel (opcjonalne)"""
 
-    def __init__(self, excel_path: Optional[Path] = None):
+    def __init__(self, excel_path: Optional[Path] = None, column_map: Optional[Dict[str, str]] = None):
+        """
+        Args:
+            excel_path: Arkusz z dodatkowymi danymi
+            column_map: Kolumna Excela -> pole PDFData nadpisywane z dopasowanego wiersza.
+                        Domyślnie kolumny o nazwach pól PDFData (np. "gramatura").
+        """
+        self.excel_path = excel_path
         self.excel_data = None
+        self.column_map: Dict[str, str] = {}
+        self._row_index: Dict[str, int] = {}
+        self._lookup = None
         if excel_path and excel_path.exists():
             import pandas as pd
             self.excel_data = pd.read_excel(excel_path)
+            self._build_index()
+            self.column_map = self._resolve_column_map(column_map)
             print(f"✓ Załadowano Excel: {len(self.excel_data)} rekordów\n")
 
+    def _build_index(self) -> None:
+        """Indeks wartość komórki -> pierwszy wiersz, w którym występuje (budowany raz)"""
+        for position, row in enumerate(self.excel_data.astype(str).itertuples(index=False, name=None)):
+            for value in row:
+                self._row_index.setdefault(value, position)
+
+    def _resolve_column_map(self, column_map: Optional[Dict[str, str]]) -> Dict[str, str]:
+        field_names = {f.name for f in fields(PDFData)}
+        if column_map is None:
+            return {column: column for column in self.excel_data.columns if column in field_names}
+
+        unknown = set(column_map.values()) - field_names
+        if unknown:
+            raise ValueError(f"Nieznane pola PDFData w column_map: {', '.join(sorted(unknown))}")
+        missing = [column for column in column_map if column not in self.excel_data.columns]
+        if missing:
+            print(f"⚠ Brak kolumn w Excel: {', '.join(missing)}")
+        return {column: name for column, name in column_map.items() if column in self.excel_data.columns}
+
     def enrich(self, data: PDFData, filename: str) -> PDFData:
         if self.excel_data is None:
             return data
 
-        # Szukaj dopasowania
-        mask = self.excel_data.astype(str).apply(
-            lambda row: filename in row.values or data.article_index in row.values,
-            axis=1
-        )
-        matching = self.excel_data[mask]
-
-        if not matching.empty:
-            excel_row = matching.iloc[0].to_dict()
-            # Możesz tutaj nadpisać dane z Excela
-            # Przykład: data.gramatura = str(excel_row.get('gramatura', data.gramatura))
+        # Szukaj dopasowania - pierwszy wiersz z nazwą pliku lub indeksem artykułu
+        positions = [
+            position for position in (self._row_index.get(filename), self._row_index.get(data.article_index))
+            if position is not None
+        ]
+
+        if positions:
+            self._apply(data, self.excel_data.iloc[min(positions)].to_dict())
             print(f"  ℹ Znaleziono dane w Excel")
 
-        return data
\ No newline at end of file
+        return data
+
+    def enrich_many(self, batch: Sequence[PDFData], filenames: Sequence[str]) -> List[PDFData]:
+        """
+        Wzbogacenie całej partii jednym złączeniem (pandas merge) zamiast wyszukiwania karta po karcie.
+
+        Klucze wszystkich kart (nazwa pliku i indeks artykułu) trafiają do jednej ramki,
+        która jest łączona z tabelą wartość -> pierwszy wiersz; dla karty wygrywa wcześniejszy wiersz,
+        tak jak w enrich.
+        """
+        batch = list(batch)
+        if self.excel_data is None or not batch:
+            return batch
+
+        import pandas as pd
+
+        keys = pd.DataFrame({
+            "card": list(range(len(batch))) * 2,
+            "value": [str(name) for name in filenames] + [str(data.article_index) for data in batch],
+        })
+        matches = keys.merge(self._lookup_frame(), on="value", how="inner").groupby("card")["position"].min()
+        if matches.empty:
+            return batch
+
+        rows = self.excel_data.iloc[matches.to_numpy()][list(self.column_map)]
+        for card, values in zip(matches.index, rows.to_dict("records")):
+            self._apply(batch[card], values)
+
+        print(f"  ℹ Znaleziono dane w Excel dla {len(matches)} z {len(batch)} kart")
+        return batch
+
+    def _lookup_frame(self):
+        """Tabela wartość -> pierwszy wiersz (ten sam indeks co _row_index, jako DataFrame do merge)"""
+        if self._lookup is None:
+            import pandas as pd
+            self._lookup = pd.DataFrame({
+                "value": list(self._row_index.keys()),
+                "position": list(self._row_index.values()),
+            })
+        return self._lookup
+
+    def _apply(self, data: PDFData, excel_row: Dict) -> None:
+        """Nadpisuje pola PDFData według column_map; puste komórki nie zmieniają danych z PDF"""
+        for column, name in self.column_map.items():
+            value = excel_row.get(column)
+            if value is None or value != value or value == "":  # value != value: NaN
+                continue
+            if name in NUMERIC_FIELDS:
+                try:
+                    value = float(str(value).replace(",", "."))
+                except ValueError:
+                    continue
+            elif isinstance(value, float) and value.is_integer():
+                value = str(int(value))
+            else:
+                value = str(value)
+            setattr(data, name, value)
@@ -1,35 +1,95 @@
+import re
 import time
+from contextlib import contextmanager
+from pathlib import Path
+from tkinter import filedialog, messagebox
+from typing import Optional, Dict, List, Callable, Set, Tuple
 
-import pyautogui
-
-from interface import IGUIAutomator
+from interface import GUIStateLost, IGUIAutomator
 from tempDataBase import PDFData
 
 
 class MainWindowGUIAutomator(IGUIAutomator):
     """Automatyzacja GUI - wpisuje dane i generuje PDF"""
 
+    # Minimalne limity czekania [s] dla poszczególnych sygnałów (pierwsza karta czeka dłużej)
+    MIN_TIMEOUTS = {"dialog": 5.0, "file": 15.0, "popup": 5.0, "closed": 5.0}
+    FIRST_CARD_TIMEOUT = 30.0
+    # Limit = TIMEOUT_FACTOR * średnia dotychczasowych czasów danego oczekiwania
+    TIMEOUT_FACTOR = 5.0
+    POLL_MIN = 0.01
+    POLL_MAX = 0.2
 
-    def __init__(self, main_window):
+    def __init__(self, main_window, output_dir: Optional[Path] = None):
         """
         Args:
             main_window: Instancja MainWindow z Twojego programu
+            output_dir: Folder, do którego Windows zapisuje wygenerowane PDF-y
+                        (pozwala czekać na plik zamiast na sztywne opóźnienia)
         """
         self.window = main_window
         self.countPDF = 0
+        self.output_dir = Path(output_dir) if output_dir else None
+        self.wait_log: List[Dict[str, float]] = []
+        self._avg_wait: Dict[str, float] = {}
+        # Pola ustawiane przy poprzedniej karcie (None = stan formularza nieznany)
+        self._form: Optional[Set[Tuple[str, str, str]]] = None
 
     def fill_form(self, data: PDFData) -> None:
-        """Wpisuje dane do formularza GUI"""
+        """
+        Wpisuje dane do formularza GUI.
+
+        Zapisywane są tylko pola, których bieżąca wartość w widgecie (get(), wiersz tabeli)
+        różni się od docelowej - ręczna edycja okna w trakcie partii też zostanie nadpisana.
+        Pełne czyszczenie formularza (_new_karta) następuje przy pierwszej karcie, po reset_form()
+        oraz gdy poprzednia karta ustawiła pole, którego ta karta nie ustawia - jego wartości
+        domyślnej po _new_karta nie znamy, więc przywrócić ją może tylko reset.
+        """
+        fields, properties = self._form_values(data)
+        previous, self._form = self._form, None  # stan nieznany, dopóki zapis się nie skończy
+
+        if previous is None or not previous <= fields.keys():
+            self.window._new_karta()
+
+        current = self._current_values(fields)
+        changed = {key: value for key, value in fields.items() if current.get(key) != value}
+        for key, value in changed.items():
+            if key[0] != "property":
+                self._write_field(key, value)
+
+        # Pola automatyczne zależą od warstw i grubości
+        if any(key[0] == "set" and key[1] == "artykul_frame" for key in changed):
+            self.window.artykul_frame._update_structure_fields()
+
+        # Wszystkie zmiany właściwości trafiają do tabeli jedną partią (jeden przebieg po wierszach)
+        self._apply_properties([prop for prop in properties if ("property", "", prop["property_name"]) in changed])
+
+        if any(key[1] == "nadruk_frame" and key[2].endswith("_combo") for key in changed):
+            print(f"  ✓ Ustawiono rodzaj nadruku: {data.print_type}")
+        print(f"  ✓ Formularz: zmienione pola {len(changed)}/{len(fields)}")
 
-        # Najpierw czyścimy formularz (nowa karta)
-        self.window._new_karta()
-        artFrame = self.window.artykul_frame
+        self._form = set(fields)
+
+    def reset_form(self) -> None:
+        """Następna karta zacznie od pełnego czyszczenia formularza (np. po ręcznej edycji okna)"""
+        self._form = None
+
+    def _form_values(self, data: PDFData) -> Tuple[Dict[Tuple[str, str, str], str], List[Dict[str, str]]]:
+        """
+        Docelowy stan formularza dla karty.
+
+        Returns:
+            (klucz pola -> wartość, definicje właściwości do tabeli)
+            Klucz = (rodzaj zapisu, ramka MainWindow, pole): "field" - Entry z frame.fields,
+            "entry" - Entry/Spinbox będący atrybutem ramki, "set" - zmienna lub Combobox, "property" - wiersz tabeli.
+        """
+        values: Dict[Tuple[str, str, str], str] = {}
 
         # === ARTYKUŁ ===
-        artFrame.fields["Nr karty"].insert(0, data.card_no)
-        artFrame.fields["Artykuł indeks"].insert(0, data.article_index)
-        artFrame.fields["Artykuł klienta"].insert(0, data.client_article_index)
-        artFrame.fields["Artykuł nazwa"].insert(0, data.article_description)
+        values[("field", "artykul_frame", "Nr karty")] = data.card_no
+        values[("field", "artykul_frame", "Artykuł indeks")] = data.article_index
+        values[("field", "artykul_frame", "Artykuł klienta")] = data.client_article_index
+        values[("field", "artykul_frame", "Artykuł nazwa")] = data.article_description
 
         # to raczej nie działą
         #self.window.artykul_frame.fields["Artykuł struktura"].insert(0, data.product_structure)
@@ -38,69 +98,69 @@ class MainWindowGUIAutomator(IGUIAutomator):
         # === STRUKTURA WARSTW ===
         # Jeśli PDFData ma warstwy rozbite np. layer1/layer2
         if hasattr(data, "layer1") and hasattr(data, "layer2"):
-            artFrame.layer1_var.set(data.layer1)
-            artFrame.layer2_var.set(data.layer2)
+            values[("set", "artykul_frame", "layer1_var")] = data.layer1
+            values[("set", "artykul_frame", "layer2_var")] = data.layer2
         else:
             # fallback jeśli nie ma warstw w PDFData
             if data.product_structure:
                 parts = data.product_structure.split('/')
-                artFrame.layer1_var.set(parts[0] if len(parts) > 0 else "OPA")
-                artFrame.layer2_var.set(parts[1] if len(parts) > 1 else "PE")
-
-        artFrame.thickness1_var.set(str(getattr(data, "thickness1", "15")))
-        artFrame.thickness2_var.set(str(getattr(data, "thickness2", "50")))
+                values[("set", "artykul_frame", "layer1_var")] = parts[0] if len(parts) > 0 else "OPA"
+                values[("set", "artykul_frame", "layer2_var")] = parts[1] if len(parts) > 1 else "PE"
 
-        # Odśwież pola automatyczne
-        artFrame._update_structure_fields()
+        values[("set", "artykul_frame", "thickness1_var")] = str(getattr(data, "thickness1", "15"))
+        values[("set", "artykul_frame", "thickness2_var")] = str(getattr(data, "thickness2", "50"))
 
         # Wpisanie do tabeli
         #self.window.artykul_frame.fields["Opis struktury"].insert(0, data.structure_description)
         #self.window.artykul_frame.fields["Skład chemiczny"].insert(0, data.chemical_composition)
 
         # === WŁAŚCIWOŚCI FIZYKOCHEMICZNE ===
-        # Używamy nazw zgodnych z domyślną tabelą i dodajemy nowe jeśli potrzeba
+        # Używamy nazw zgodnych z domyślną tabelą i dodajemy nowe jeśli potrzeba.
+        properties = []
         if data.gramatura:
-            self._add_or_update_property(
+            properties.append(dict(
                 property_name="Weight",
                 value=data.gramatura,
                 method="PN-81/P 50129",
                 unit="g/m²",
                 deviation="-15 +15 %"
-            )
+            ))
         if data.otr:
-            self._add_or_update_property(
+            properties.append(dict(
                 property_name="OTR (barrier O₂)",
                 value=data.otr,
                 method="DIN 53380",
                 unit="cm³/m²×24h×0,1MPa",
                 deviation="-1 +2 cm³/m²×24h×0,1MPa"
-            )
+            ))
         if data.wvtr:
-            self._add_or_update_property(
+            properties.append(dict(
                 property_name="WVTR (barrier H₂O)",
                 value=data.wvtr,
                 method="DIN 53122",
                 unit="g/m²×24h",
                 deviation="-2 +3 g/m²×24h"
-            )
+            ))
         if data.thickness:
-            self._add_or_update_property(
+            properties.append(dict(
                 property_name="Thickness",
                 value=data.thickness,
                 method="PN-ISO 4593",
                 unit="μm",
                 deviation="-10 +10 %"
-            )
+            ))
+        for prop in properties:
+            values[("property", "", prop["property_name"])] = prop["value"]
 
         # === NADRUK ===
         # Rodzaj nadruku - parsowanie na 3 pola (warstwa/typ/symetria)
         if data.print_type:
-            self._parse_print_type(data.print_type)
+            for combo, value in self._print_type_parts(data.print_type).items():
+                values[("set", "nadruk_frame", combo)] = value
 
         # Ilość kolorów
         if data.number_of_colours:
-            self.window.nadruk_frame.ilosc_kolorow_spin.delete(0, 'end')
-            self.window.nadruk_frame.ilosc_kolorow_spin.insert(0, data.number_of_colours)
+            values[("entry", "nadruk_frame", "ilosc_kolorow_spin")] = data.number_of_colours
 
         # Lakier
         value_to_insert = data.solid_lacquer
@@ -108,56 +168,154 @@ class MainWindowGUIAutomator(IGUIAutomator):
             value_to_insert = "-"
 
         if "Lakier" in self.window.nadruk_frame.fields:
-            field = self.window.nadruk_frame.fields["Lakier"]
-            field.delete(0, 'end')
-            field.insert(0, value_to_insert)
+            values[("field", "nadruk_frame", "Lakier")] = value_to_insert
 
         # === PAKOWANIE ===
-        if data.winding_code:
-            self.window.pakowanie_frame.fields["Kod nawoju"].insert(0, data.winding_code)
-        if data.core:
-            self.window.pakowanie_frame.fields["Tuleja wewnętrzna"].insert(0, data.core)
-        if data.external_diameter:
-            self.window.pakowanie_frame.fields["Średnica nawoju"].insert(0, data.external_diameter)
-        if data.width_of_core:
-            self.window.pakowanie_frame.fields["Szerokość tulei"].insert(0, data.width_of_core)
-        if data.core_submission:
-            self.window.pakowanie_frame.fields["Wysunięcie tulei"].insert(0, data.core_submission)
+        # Puste wartości też trafiają do migawki - pole po poprzedniej karcie trzeba wyczyścić
+        values[("field", "pakowanie_frame", "Kod nawoju")] = data.winding_code or ""
+        values[("field", "pakowanie_frame", "Tuleja wewnętrzna")] = data.core or ""
+        values[("field", "pakowanie_frame", "Średnica nawoju")] = data.external_diameter or ""
+        values[("field", "pakowanie_frame", "Szerokość tulei")] = data.width_of_core or ""
+        values[("field", "pakowanie_frame", "Wysunięcie tulei")] = data.core_submission or ""
 
         # === PODPISY ===
         if data.prepared_by:
-            combo = self.window.podpisy_frame.opracowal_combo
-            combo.set(data.prepared_by)
+            values[("set", "podpisy_frame", "opracowal_combo")] = data.prepared_by
+
+        return values, properties
+
+    def _current_values(self, fields: Dict[Tuple[str, str, str], str]) -> Dict[Tuple[str, str, str], Optional[str]]:
+        """Bieżące wartości pól formularza (None = nie da się odczytać → pole zostanie zapisane)"""
+        current: Dict[Tuple[str, str, str], Optional[str]] = {}
+        for key in fields:
+            if key[0] != "property":
+                current[key] = self._read_field(key)
+
+        names = [key[2] for key in fields if key[0] == "property"]
+        if names:
+            try:
+                index, _ = self._property_index(names)
+            except Exception:
+                index = {}
+            for name in names:
+                current[("property", "", name)] = str(index[name][1][3]) if name in index else None
+        return current
+
+    def _read_field(self, key: Tuple[str, str, str]) -> Optional[str]:
+        kind, frame_name, name = key
+        try:
+            frame = getattr(self.window, frame_name)
+            if kind == "set":
+                return str(getattr(frame, name).get())
+            widget = frame.fields[name] if kind == "field" else getattr(frame, name)
+            return str(widget.get())
+        except Exception:
+            return None
+
+    def _write_field(self, key: Tuple[str, str, str], value: str) -> None:
+        """Jeden zapis do widgetu: Entry - delete + insert, zmienna/Combobox - set"""
+        kind, frame_name, name = key
+        frame = getattr(self.window, frame_name)
+        if kind == "set":
+            getattr(frame, name).set(value)
+            return
+
+        widget = frame.fields[name] if kind == "field" else getattr(frame, name)
+        widget.delete(0, 'end')
+        if value:
+            widget.insert(0, value)
 
     def _set_property_value(self, property_name: str, value: str) -> None:
         """Wpisuje wartość właściwości bezpośrednio w Treeview"""
         try:
-            # Bezpośredni dostęp do Treeview
-            for item in self.window.wlasciwosci_table.tree.get_children():
-                values = self.window.wlasciwosci_table.tree.item(item, 'values')
-
-                # values[0] = Lp.
-                # values[1] = Parametr (nazwa właściwości)
-                # values[2] = Metoda badania
-                # values[3] = Wartość ← tutaj wpisujemy
-                # values[4] = Jednostka
-                # values[5] = Odchylenie
-
-                if len(values) >= 6 and str(values[1]) == property_name:
-                    # Zaktualizuj tylko wartość (indeks 3)
-                    new_values = list(values)
-                    new_values[3] = value
-                    self.window.wlasciwosci_table.tree.item(item, values=new_values)
-                    print(f"  ✓ Ustawiono {property_name} = {value}")
-                    return
+            tree = self.window.wlasciwosci_table.tree
+            index, _ = self._property_index({property_name})
+
+            # values[0] = Lp.
+            # values[1] = Parametr (nazwa właściwości)
+            # values[2] = Metoda badania
+            # values[3] = Wartość ← tutaj wpisujemy
+            # values[4] = Jednostka
+            # values[5] = Odchylenie
+            if property_name in index:
+                item, values = index[property_name]
+                # Zaktualizuj tylko wartość (indeks 3)
+                new_values = list(values)
+                new_values[3] = value
+                tree.item(item, values=new_values)
+                print(f"  ✓ Ustawiono {property_name} = {value}")
+                return
 
             print(f"  ⚠ Nie znaleziono właściwości: {property_name}")
 
         except Exception as e:
             print(f"  ⚠ Błąd przy ustawianiu {property_name}: {e}")
 
+    def _property_index(self, names) -> Tuple[Dict[str, Tuple[str, tuple]], int]:
+        """
+        Jeden przebieg po wierszach tabeli właściwości.
+
+        Returns:
+            (nazwa -> (item, values) dla szukanych nazw - pierwszy pasujący wiersz, liczba wierszy)
+        """
+        tree = self.window.wlasciwosci_table.tree
+        children = tree.get_children()
+        index = {}
+        wanted = set(names)
+        for item in children:
+            if not wanted:
+                break  # wszystkie szukane nazwy znalezione
+            values = tree.item(item, 'values')
+            if len(values) >= 6 and str(values[1]) in wanted:
+                index[str(values[1])] = (item, values)
+                wanted.discard(str(values[1]))
+        return index, len(children)
+
     def generate_pdf(self) -> None:
         """Generuje PDF klikając przycisk w GUI i automatycznie zatwierdza okna systemowe"""
+        import pyautogui  # import leniwy - wymaga ekranu, niepotrzebny w trybie headless
+
+        if self.output_dir is None or not hasattr(pyautogui, "getActiveWindowTitle"):
+            self._generate_pdf_fixed_delays()
+            return
+
+        started = time.perf_counter()
+        # Okna, które mogą mieć fokus przed kliknięciem (np. okno postępu importu w tle),
+        # nie są ani oknem zapisu, ani popupem - czekamy na nowe okno
+        idle_titles = {self.window.root.title(), self._active_title()}
+        before = self._snapshot_outputs()
+
+        self.window._generate_pdf()  # kliknięcie "Generuj PDF"
+
+        try:
+            # Okno zapisu pojawiło się na pierwszym planie → zatwierdź
+            self._wait_for("dialog", lambda: self._active_title() not in idle_titles)
+            dialog_title = self._active_title()
+            pyautogui.press("enter")
+
+            # Nowy plik w folderze docelowym jest kompletny → PDF zapisany
+            self._wait_for("file", self._new_output_ready(before))
+
+            # Kliknij OK w popupie z informacją o wygenerowanym PDF
+            self._wait_for("popup", lambda: self._active_title() not in idle_titles | {dialog_title})
+            pyautogui.press("enter")
+            self._wait_for("closed", lambda: self._active_title() in idle_titles)
+        except TimeoutError as e:
+            # Z oknem programu na pierwszym planie karta jest tylko nieudana; w innym oknie kolejne
+            # naciśnięcia Enter trafiłyby nie tam, gdzie trzeba - partia jest przerywana
+            self._form = None
+            active = self._active_title()
+            if active in idle_titles:
+                raise
+            raise GUIStateLost(f"{e}; aktywne okno: '{active}' - partia przerwana") from e
+
+        print(f"  ✓ PDF wygenerowany ({time.perf_counter() - started:.2f} s)")
+        self.countPDF += 1
+
+    def _generate_pdf_fixed_delays(self) -> None:
+        """Stary tryb ze sztywnymi opóźnieniami - gdy nie ma jak obserwować okien/folderu"""
+        import pyautogui
+
         if self.countPDF == 0:
             time.sleep(3)
 
@@ -175,38 +333,109 @@ class MainWindowGUIAutomator(IGUIAutomator):
         print("  ✓ PDF wygenerowany")
         self.countPDF += 1
 
+    def _wait_for(self, kind: str, condition: Callable[[], bool]) -> float:
+        """
+        Odpytuje warunek z rosnącym interwałem aż do skutku.
+        Limit czasu dopasowuje się do dotychczasowych czasów tego samego oczekiwania.
+
+        Returns:
+            float: Czas oczekiwania w sekundach
+        """
+        if kind in self._avg_wait:
+            timeout = max(self.MIN_TIMEOUTS[kind], self.TIMEOUT_FACTOR * self._avg_wait[kind])
+        else:
+            timeout = max(self.MIN_TIMEOUTS[kind], self.FIRST_CARD_TIMEOUT)
+
+        started = time.perf_counter()
+        delay = self.POLL_MIN
+        while not condition():
+            elapsed = time.perf_counter() - started
+            if elapsed > timeout:
+                raise TimeoutError(f"Nie doczekano się '{kind}' w ciągu {timeout:.1f} s")
+            time.sleep(delay)
+            delay = min(delay * 2, self.POLL_MAX)
+
+        elapsed = time.perf_counter() - started
+        # Średnia krocząca (EMA) - szybko reaguje na zmianę obciążenia maszyny
+        self._avg_wait[kind] = elapsed if kind not in self._avg_wait else 0.7 * self._avg_wait[kind] + 0.3 * elapsed
+        self.wait_log.append({"card": self.countPDF + 1, "kind": kind, "seconds": elapsed})
+        return elapsed
+
+    @staticmethod
+    def _active_title() -> str:
+        import pyautogui
+        return pyautogui.getActiveWindowTitle() or ""
+
+    def _snapshot_outputs(self) -> Dict[Path, Tuple[int, int]]:
+        snapshot = {}
+        for pdf in self.output_dir.glob("*.pdf"):
+            stat = pdf.stat()
+            snapshot[pdf] = (stat.st_size, stat.st_mtime_ns)
+        return snapshot
+
+    def _new_output_ready(self, before: Dict[Path, Tuple[int, int]]) -> Callable[[], bool]:
+        """
+        Warunek: pojawił się nowy (lub nadpisany) PDF, plik kończy się znacznikiem %%EOF,
+        a rozmiar i mtime są takie same w dwóch kolejnych odpytaniach (bez stałego czekania).
+        """
+        last: Dict[Path, Tuple[int, int]] = {}
+
+        def condition() -> bool:
+            for pdf, state in self._snapshot_outputs().items():
+                if before.get(pdf) == state or state[0] == 0:
+                    continue
+                if last.get(pdf) == state and self._pdf_complete(pdf):
+                    return True
+                last[pdf] = state
+            return False
+
+        return condition
+
+    @staticmethod
+    def _pdf_complete(pdf: Path) -> bool:
+        """Plik kończy się %%EOF (dopuszczalne końcowe białe znaki); zablokowany przez zapis → False"""
+        try:
+            with open(pdf, "rb") as f:
+                f.seek(max(f.seek(0, 2) - 1024, 0))
+                return f.read().rstrip().endswith(b"%%EOF")
+        except OSError:
+            return False
+
     def _parse_print_type(self, print_type: str) -> None:
         """
         Parsuje rodzaj nadruku na 3 pola: warstwa, typ, symetria
         Przykład: "sandwich printing/reverse/symmetrical"
         """
         try:
-            # Rozdziel po "/"
-            parts = [p.strip() for p in print_type.split('/')]
-
-            # Warstwa (sandwich printing / superficial)
-            if len(parts) > 0:
-                warstwa = parts[0]
-                if warstwa in ["sandwich printing", "superficial"]:
-                    self.window.nadruk_frame.warstwa_combo.set(warstwa)
-
-            # Typ (simple / reverse)
-            if len(parts) > 1:
-                typ = parts[1]
-                if typ in ["simple", "reverse"]:
-                    self.window.nadruk_frame.typ_combo.set(typ)
-
-            # Symetria (symmetrical / asymmetrical)
-            if len(parts) > 2:
-                symetria = parts[2]
-                if symetria in ["symmetrical", "asymmetrical"]:
-                    self.window.nadruk_frame.symetria_combo.set(symetria)
+            for combo, value in self._print_type_parts(print_type).items():
+                getattr(self.window.nadruk_frame, combo).set(value)
 
             print(f"  ✓ Ustawiono rodzaj nadruku: {print_type}")
 
         except Exception as e:
             print(f"  ⚠ Nie udało się sparsować rodzaju nadruku: {e}")
 
+    @staticmethod
+    def _print_type_parts(print_type: str) -> Dict[str, str]:
+        """Rodzaj nadruku → {combo w nadruk_frame: wartość}, tylko rozpoznane części"""
+        # Rozdziel po "/"
+        parts = [p.strip() for p in print_type.split('/')]
+        combos = {}
+
+        # Warstwa (sandwich printing / superficial)
+        if len(parts) > 0 and parts[0] in ["sandwich printing", "superficial"]:
+            combos["warstwa_combo"] = parts[0]
+
+        # Typ (simple / reverse)
+        if len(parts) > 1 and parts[1] in ["simple", "reverse"]:
+            combos["typ_combo"] = parts[1]
+
+        # Symetria (symmetrical / asymmetrical)
+        if len(parts) > 2 and parts[2] in ["symmetrical", "asymmetrical"]:
+            combos["symetria_combo"] = parts[2]
+
+        return combos
+
     def _map_property_name(self, pdf_name: str) -> str:
         """Mapuje nazwy z PDF na nazwy w tabeli"""
         mapping = {
@@ -229,27 +458,136 @@ class MainWindowGUIAutomator(IGUIAutomator):
             unit: Jednostka
             deviation: Odchylenie
         """
+        self._apply_properties([dict(
+            property_name=property_name, value=value, method=method, unit=unit, deviation=deviation
+        )])
+
+    def _apply_properties(self, properties: List[Dict[str, str]]) -> None:
+        """
+        Dodaje/aktualizuje całą listę właściwości jedną partią:
+        jeden przebieg po tabeli buduje indeks nazwa → wiersz, potem same zapisy.
+        Pomiędzy zapisami nie ma update() - Tk przerysuje tabelę raz, w wolnej chwili.
+        """
+        if not properties:
+            return
+
+        tree = self.window.wlasciwosci_table.tree
         try:
-            # Najpierw sprawdź czy właściwość już istnieje
-            found = False
-            for item in self.window.wlasciwosci_table.tree.get_children():
-                values = self.window.wlasciwosci_table.tree.item(item, 'values')
+            index, row_count = self._property_index(p["property_name"] for p in properties)
+        except Exception as e:
+            print(f"  ⚠ Błąd przy odczycie tabeli właściwości: {e}")
+            return
 
-                if len(values) >= 6 and str(values[1]) == property_name:
+        for prop in properties:
+            property_name, value = prop["property_name"], prop["value"]
+            try:
+                if property_name in index:
                     # Zaktualizuj istniejącą właściwość
+                    item, values = index[property_name]
                     new_values = list(values)
                     new_values[3] = value  # Wartość
-                    self.window.wlasciwosci_table.tree.item(item, values=new_values)
+                    tree.item(item, values=new_values)
+                    index[property_name] = (item, tuple(new_values))
                     print(f"  ✓ Zaktualizowano {property_name} = {value}")
-                    found = True
-                    break
+                else:
+                    # Jeśli nie znaleziono, dodaj nową właściwość
+                    row_count += 1
+                    new_values = [str(row_count), property_name, prop["method"], value, prop["unit"], prop["deviation"]]
+                    item = tree.insert("", "end", values=new_values)
+                    index[property_name] = (item, tuple(new_values))
+                    print(f"  ✓ Dodano {property_name} = {value}")
+
+            except Exception as e:
+                print(f"  ⚠ Błąd przy dodawaniu/aktualizacji {property_name}: {e}")
+
+
+class HeadlessGUIAutomator(MainWindowGUIAutomator):
+    """
+    Automatyzacja bez widocznego okna: dane trafiają bezpośrednio do widgetów MainWindow
+    (ukryte okno), a _generate_pdf dostaje ścieżkę zapisu bez okien dialogowych.
+    Nie używa pyautogui - komputer jest wolny podczas przetwarzania.
+    """
+
+    def __init__(self, main_window, output_dir: Path):
+        """
+        Args:
+            main_window: Instancja MainWindow z Twojego programu
+            output_dir: Folder zapisu wygenerowanych PDF-ów
+        """
+        super().__init__(main_window, output_dir)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self._card_no = ""
+        self._hidden = False
+        self._used_names: Dict[str, int] = {}  # nazwa -> liczba kart o tej nazwie w tej sesji
 
-            # Jeśli nie znaleziono, dodaj nową właściwość
-            if not found:
-                lp = len(self.window.wlasciwosci_table.tree.get_children()) + 1
-                new_values = [str(lp), property_name, method, value, unit, deviation]
-                self.window.wlasciwosci_table.tree.insert("", "end", values=new_values)
-                print(f"  ✓ Dodano {property_name} = {value}")
+    def fill_form(self, data: PDFData) -> None:
+        # Okno ukrywane na czas partii, przywracane w close()
+        if not self._hidden:
+            self.window.root.withdraw()
+            self._hidden = True
+        self._card_no = data.card_no
+        super().fill_form(data)
+
+    def close(self) -> None:
+        """Koniec partii - okno programu znów widoczne"""
+        if self._hidden:
+            self.window.root.deiconify()
+            self._hidden = False
 
-        except Exception as e:
-            print(f"  ⚠ Błąd przy dodawaniu/aktualizacji {property_name}: {e}")
+    def generate_pdf(self) -> None:
+        """Renderuje PDF do output_dir - okna zapisu i komunikaty są pomijane"""
+        target = self._target_path()
+        before = self._file_state(target)
+
+        with self._silent_dialogs(target):
+            self.window._generate_pdf()
+
+        # Plik musi powstać albo zmienić się teraz - stary plik z poprzedniego przebiegu się nie liczy
+        after = self._file_state(target)
+        if after is None or after == before:
+            raise RuntimeError(f"MainWindow nie zapisał pliku {target.name}")
+
+        print(f"  ✓ PDF wygenerowany: {target.name}")
+        self.countPDF += 1
+
+    def _target_path(self) -> Path:
+        """<nr karty>.pdf; kolejna karta o tym samym numerze w tej sesji dostaje sufiks _2, _3..."""
+        name = re.sub(r'[\\/:*?"<>|\s]+', "_", self._card_no).strip("_") or f"karta_{self.countPDF + 1}"
+        count = self._used_names.get(name, 0) + 1
+        self._used_names[name] = count
+        return self.output_dir / (f"{name}.pdf" if count == 1 else f"{name}_{count}.pdf")
+
+    @staticmethod
+    def _file_state(path: Path) -> Optional[Tuple[int, int]]:
+        try:
+            stat = path.stat()
+        except OSError:
+            return None
+        return stat.st_size, stat.st_mtime_ns
+
+    @contextmanager
+    def _silent_dialogs(self, target: Path):
+        """
+        Podmienia okna dialogowe tkinter na czas generowania:
+        wybór pliku zwraca target, komunikaty są tylko wypisywane w konsoli.
+        """
+        def log(title=None, message=None, **_):
+            print(f"  ℹ {title}: {message}")
+
+        replacements = {
+            (filedialog, "asksaveasfilename"): lambda **_: str(target),
+            (filedialog, "askdirectory"): lambda **_: str(self.output_dir),
+            (messagebox, "showinfo"): log,
+            (messagebox, "showwarning"): log,
+            (messagebox, "showerror"): log,
+            (messagebox, "askyesno"): lambda *_, **__: True,
+            (messagebox, "askokcancel"): lambda *_, **__: True,
+        }
+        originals = {key: getattr(*key) for key in replacements}
+        try:
+            for (module, name), replacement in replacements.items():
+                setattr(module, name, replacement)
+            yield
+        finally:
+            for (module, name), original in originals.items():
+                setattr(module, name, original)
@@ -0,0 +1,204 @@
+import queue
+import threading
+import time
+import tkinter as tk
+from tkinter import ttk
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+from interface import GUIStateLost
+from model import PDFtoGUIService
+
+
+class ImportProgressWindow(tk.Toplevel):
+    """Okno postępu importu: pasek, przepustowość, szacowany czas do końca, przycisk Anuluj"""
+
+    def __init__(self, master, on_cancel: Callable[[], None]):
+        super().__init__(master)
+        self.title("Import z PDF")
+        self.resizable(False, False)
+        self.protocol("WM_DELETE_WINDOW", on_cancel)
+
+        self.status_label = tk.Label(self, text="Przygotowanie listy plików...", anchor="w", width=55)
+        self.status_label.pack(padx=10, pady=(10, 2), fill="x")
+
+        self.progress_bar = ttk.Progressbar(self, length=380, mode="indeterminate")
+        self.progress_bar.pack(padx=10, pady=5)
+        self.progress_bar.start(10)
+
+        self.info_label = tk.Label(self, text="", anchor="w", width=55)
+        self.info_label.pack(padx=10, pady=2, fill="x")
+
+        self.cancel_button = tk.Button(self, text="Anuluj", command=on_cancel, padx=15)
+        self.cancel_button.pack(pady=(5, 10))
+
+    def set_total(self, total: int) -> None:
+        self.progress_bar.stop()
+        self.progress_bar.config(mode="determinate", maximum=max(total, 1), value=0)
+        self.status_label.config(text=f"0/{total}")
+
+    def show_progress(self, done: int, total: int, current: str, elapsed: float) -> None:
+        rate = done / elapsed if elapsed > 0 else 0.0
+        eta = (total - done) / rate if rate > 0 else None
+        self.progress_bar.config(maximum=max(total, 1), value=done)
+        self.status_label.config(text=f"{done}/{total}: {current}")
+        self.info_label.config(text=f"{rate:.2f} kart/s · pozostało ~{self._format_seconds(eta)}")
+
+    def show_cancelling(self) -> None:
+        self.cancel_button.config(state="disabled")
+        self.status_label.config(text="Anulowanie - kończenie bieżącej karty...")
+
+    @staticmethod
+    def _format_seconds(seconds: Optional[float]) -> str:
+        if seconds is None:
+            return "?"
+        minutes, seconds = divmod(int(round(seconds)), 60)
+        hours, minutes = divmod(minutes, 60)
+        return f"{hours}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes}:{seconds:02d}"
+
+
+class BackgroundImport:
+    """
+    Import folderu bez zamrażania okna programu.
+
+    Wątek roboczy: lista plików (z dziennikiem wznowienia), ekstrakcja, parsowanie i Excel
+    (service.iter_prepared). Gotowe karty trafiają do ograniczonej kolejki.
+    Wątek Tk: pętla after() co POLL_MS bierze z kolejki jedną kartę i robi tylko
+    fill_form/generate_pdf (service.handle_card). Anulowanie działa pomiędzy kartami.
+
+    Użycie:
+        BackgroundImport(main_window.root, service, Path(folder), prepared_by, on_done=pokaz_podsumowanie).start()
+    """
+
+    # Odstęp odpytywania kolejki, gdy nic nie czeka [ms]
+    POLL_MS = 50
+
+    def __init__(self, root, service: PDFtoGUIService, directory: Path, prepared_by: str,
+                 resume: bool = True, on_done: Optional[Callable[[Dict[str, int], bool], None]] = None):
+        """
+        Args:
+            root: Okno Tk, w którego pętli zdarzeń działa automatyzacja GUI
+            resume: Jak w process_directory - pomiń pliki już wygenerowane
+            on_done: Wywoływane w wątku Tk po zakończeniu: on_done(stats, cancelled)
+        """
+        self.root = root
+        self.service = service
+        self.directory = directory
+        self.prepared_by = prepared_by
+        self.resume = resume
+        self.on_done = on_done
+
+        self.stats: Dict[str, int] = {'success': 0, 'failed': 0, 'skipped': 0, 'duplicates': 0}
+        self.total = 0
+        self.done = 0
+        self._files = 0
+        self._known_duplicates = 0
+        self._started_batch = False
+        self._started_at = 0.0
+
+        self._queue: "queue.Queue" = queue.Queue(maxsize=service.queue_size)
+        self._cancel = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="pdf-import", daemon=True)
+        self.window: Optional[ImportProgressWindow] = None
+
+    def start(self) -> None:
+        self.window = ImportProgressWindow(self.root, self.cancel)
+        self._thread.start()
+        self.root.after(self.POLL_MS, self._poll)
+
+    def cancel(self) -> None:
+        """Zatrzymuje import po bieżącej karcie"""
+        if not self._cancel.is_set():
+            print("\n⏹ Anulowanie importu...")
+            self._cancel.set()
+            if self.window is not None:
+                self.window.show_cancelling()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    # ------------------------------------------------------------------ wątek roboczy
+
+    def _run(self) -> None:
+        error = None
+        try:
+            pdf_files, stats = self.service.start_batch(self.directory, self.resume, self.prepared_by)
+            self._put(("start", (pdf_files, stats)), force=True)
+
+            cards = self.service.iter_prepared(pdf_files, self.prepared_by, stats)
+            try:
+                for card in cards:
+                    if not self._put(("card", card)):
+                        break
+            finally:
+                cards.close()  # zamyka też pulę procesów
+        except Exception as e:
+            error = e
+        finally:
+            self._put(("done", error), force=True)
+
+    def _put(self, message, force: bool = False) -> bool:
+        """Wstawia do kolejki czekając na miejsce; bez force przerywa po anulowaniu"""
+        while force or not self._cancel.is_set():
+            try:
+                self._queue.put(message, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    # ------------------------------------------------------------------ wątek Tk
+
+    def _poll(self) -> None:
+        try:
+            kind, payload = self._queue.get_nowait()
+        except queue.Empty:
+            self.root.after(self.POLL_MS, self._poll)
+            return
+
+        if kind == "start":
+            pdf_files, self.stats = payload
+            self._started_batch = bool(pdf_files) or self.stats['skipped'] > 0
+            self._files = self.total = len(pdf_files)
+            # Duplikaty pominięte już przy wznowieniu nie są w pdf_files
+            self._known_duplicates = self.stats['duplicates']
+            self._started_at = time.perf_counter()
+            self.window.set_total(self.total)
+
+        elif kind == "card":
+            # Po anulowaniu karty przygotowane z wyprzedzeniem są tylko zdejmowane z kolejki
+            if not self.cancelled:
+                # Duplikaty są odrzucane w wątku roboczym przed pierwszą kartą
+                self.total = self._files - (self.stats['duplicates'] - self._known_duplicates)
+                try:
+                    self.service.handle_card(*payload, self.prepared_by, self.stats, enriched=True)
+                except GUIStateLost as e:
+                    # Stan okien nieznany - kolejne karty nie mogą wysyłać klawiszy, import jest anulowany
+                    self.stats['failed'] += 1
+                    self.service._print_error(e)
+                    self.cancel()
+                self.done += 1
+                self.window.show_progress(
+                    self.done, self.total, payload[0].name, time.perf_counter() - self._started_at
+                )
+
+        elif kind == "done":
+            self._finish(payload)
+            return
+
+        # Kolejna karta od razu, ale przez pętlę zdarzeń - okno zdąży się odświeżyć
+        self.root.after(1, self._poll)
+
+    def _finish(self, error: Optional[Exception]) -> None:
+        if error is not None:
+            self.service._print_error(error)
+        if self._started_batch:
+            self.service.finish_batch()
+
+        if self.window is not None:
+            self.window.destroy()
+            self.window = None
+
+        if self.on_done is not None:
+            self.on_done(self.stats, self.cancelled)
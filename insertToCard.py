@@ -3,9 +3,42 @@ from tkinter import filedialog, simpledialog
 from pathlib import Path
 
 
-from model import PDFtoGUIServiceFactory
+from model import JOURNAL_NAME, PDFtoGUIServiceFactory
+from importWorker import BackgroundImport
+from pdfStorage import PDFDataRepository
 from models import DOSTEPNE_OSOBY
 
+# Liczba procesów robiących ekstrakcję/parsowanie w tle (0 = szeregowo)
+IMPORT_WORKERS = 4
+
+# Backend ekstrakcji: "pdfplumber" lub "content-stream" (szybszy, z automatycznym powrotem do pdfplumber)
+IMPORT_EXTRACTOR = "content-stream"
+
+# Limit pamięci na jeden PDF [MB] - plik, który go przekroczy, jest oznaczany jako błąd (None = bez limitu).
+# Strony są zwalniane zaraz po odczycie, więc limit dotyczy wyłącznie patologicznych plików.
+MAX_RSS_PER_FILE_MB = 1024
+
+# Nadzorowane procesy ekstrakcji: zawieszony lub pamięciożerny PDF jest zabijany i zgłaszany jako błąd
+FILE_TIMEOUT_S = 120
+WORKER_MEMORY_MB = 2048
+
+# Cache wyekstrahowanego tekstu i danych - ponowny import tego samego folderu nie czyta PDF-ów
+CACHE_DIR = Path.home() / ".pdf_import_cache"
+
+# Baza SQLite z danymi wszystkich zaimportowanych kart
+DATABASE_PATH = Path.home() / "pdf_import.db"
+
+# Metryki czasów etapów (JSON + CSV) zapisywane po każdym imporcie
+METRICS_DIR = Path.home() / "pdf_import_metrics"
+
+# Pomijanie duplikatów kart przed GUI: "mtime" (najnowszy plik), "revision" (najwyższa rewizja w nazwie), None = wyłączone.
+# Uwaga: deduplikacja musi najpierw sparsować CAŁY folder - pierwsza karta trafia do GUI dopiero
+# po ekstrakcji wszystkich plików (brak nakładania ekstrakcji z GUI, cała partia w pamięci).
+# Włączać dla folderów z wieloma wersjami tych samych kart.
+DEDUP_RULE = None
+
+# True = generowanie bez widocznego okna i bez pyautogui (okno programu zostaje ukryte)
+HEADLESS_IMPORT = False
 
 # ============================================================================
 # INTEGRACJA Z TWOIM PROGRAMEM
@@ -72,43 +105,74 @@ def integrateWithGUI(main_window):
             if excel_file:
                 excel_path = Path(excel_file)
 
+        # Wznowienie: dziennik pomija karty wygenerowane wcześniej z tymi samymi ustawieniami
+        # (folder wyników, osoba, Excel). "Nie" czyści dziennik - wszystkie karty od nowa.
+        journal_path = Path(pdf_folder) / JOURNAL_NAME
+        if journal_path.exists() and not tk.messagebox.askyesno(
+            "Import z PDF",
+            "Ten folder był już importowany.\n\n"
+            "Tak - wznów (pomiń karty już wygenerowane z tymi samymi ustawieniami)\n"
+            "Nie - przetwórz wszystkie pliki od nowa"
+        ):
+            journal_path.unlink()
+
         root.destroy()
 
-        # Tworzenie serwisu i przetwarzanie
+        # Tworzenie serwisu i przetwarzanie w tle - okno programu nie zamarza,
+        # do wątku Tk trafia tylko wypełnianie formularza i generowanie PDF
 
-        service = PDFtoGUIServiceFactory.create(main_window, excel_path)
-        stats = service.process_directory(Path(pdf_folder), prepared_by)
+        service = PDFtoGUIServiceFactory.create(
+            main_window, excel_path, workers=IMPORT_WORKERS, streaming=True, cache_dir=CACHE_DIR,
+            output_dir=Path(output_folder), headless=HEADLESS_IMPORT, db_path=DATABASE_PATH,
+            metrics_dir=METRICS_DIR, extractor=IMPORT_EXTRACTOR, dedup=DEDUP_RULE,
+            low_memory=True, max_rss_mb=MAX_RSS_PER_FILE_MB, file_timeout_s=FILE_TIMEOUT_S,
+            worker_memory_mb=WORKER_MEMORY_MB
+        )
 
+        def on_import_done(stats, cancelled):
+            for button in batch_buttons:
+                button.config(state="normal")
 
-        print("IMPORT ZAKOŃCZONY")
-        print(f"✓ Sukces: {stats['success']}")
-        print(f"✗ Błędy: {stats['failed']}")
-        print(f"PDF-y zostały wygenerowane!")
+            print("IMPORT ANULOWANY" if cancelled else "IMPORT ZAKOŃCZONY")
+            print(f"✓ Sukces: {stats['success']}")
+            print(f"✗ Błędy: {stats['failed']}")
+            print(f"⏭ Pominięte (już wygenerowane): {stats['skipped']}")
+            print(f"🧹 Pominięte duplikaty: {stats['duplicates']}")
+            print(f"PDF-y zostały wygenerowane!")
 
-        # Stwórz nowe okno na podsumowanie
+            # Stwórz nowe okno na podsumowanie
 
 
-        def summaryBox ():
+            def summaryBox ():
 
-            summaryRoot = tk.Tk()
-            summaryRoot.withdraw()
+                summaryRoot = tk.Tk()
+                summaryRoot.withdraw()
 
-            tk.messagebox.showinfo(
-                "Import zakończony",
-                f"Przetworzono pliki PDF:\n\n"
-                f"✓ Sukces: {stats['success']}\n"
-                f"✗ Błędy: {stats['failed']}\n\n"
-                f"PDF-y zostały wygenerowane!"
-            )
+                tk.messagebox.showinfo(
+                    "Import anulowany" if cancelled else "Import zakończony",
+                    f"Przetworzono pliki PDF:\n\n"
+                    f"✓ Sukces: {stats['success']}\n"
+                    f"✗ Błędy: {stats['failed']}\n"
+                    f"⏭ Pominięte (już wygenerowane): {stats['skipped']}\n"
+                    f"🧹 Pominięte duplikaty: {stats['duplicates']}\n\n"
+                    f"PDF-y zostały wygenerowane!"
+                )
 
-            print("okienko")
+                print("okienko")
 
-            summaryRoot.destroy()
+                summaryRoot.destroy()
 
-        summaryBox()
-        print("==Koniec==")
-        summaryBox()
-        summaryBox()
+            summaryBox()
+            print("==Koniec==")
+            summaryBox()
+            summaryBox()
+
+        # Pozostałe przyciski też piszą do formularza - w trakcie partii pomieszałyby karty
+        for button in batch_buttons:
+            button.config(state="disabled")
+        BackgroundImport(
+            main_window.root, service, Path(pdf_folder), prepared_by, resume=True, on_done=on_import_done
+        ).start()
 
     def import_single_pdf():
         """Handler dla przycisku Import pojedynczego PDF - tylko wczytanie danych"""
@@ -122,12 +186,11 @@ def integrateWithGUI(main_window):
             return
 
         # Tworzenie serwisu (bez Excel, bez prepared_by)
-        service = PDFtoGUIServiceFactory.create(main_window, excel_path=None)
+        service = PDFtoGUIServiceFactory.create(main_window, excel_path=None, cache_dir=CACHE_DIR)
 
         try:
             # Przetwórz pojedynczy PDF
-            text = service.text_extractor.extract_text(Path(pdf_file))
-            data = service.data_parser.parse(text)
+            data = service.parse_pdf(Path(pdf_file))
 
             # Wypełnij formularz (BEZ generowania PDF)
             service.gui_automator.fill_form(data)
@@ -160,6 +223,26 @@ def integrateWithGUI(main_window):
 
             error_root.destroy()
 
+    def load_card_from_database():
+        """Handler dla przycisku Wczytaj kartę z bazy - wyszukiwanie po numerze karty, bez ponownego parsowania PDF"""
+
+        card_no = simpledialog.askstring("Wczytaj kartę", "Podaj numer karty (Card No):")
+        if not card_no:
+            return
+
+        repository = PDFDataRepository(DATABASE_PATH)
+        try:
+            data = repository.get_by_card_no(card_no.strip())
+        finally:
+            repository.close()
+
+        if data is None:
+            tk.messagebox.showwarning("Wczytaj kartę", f"Nie znaleziono karty {card_no} w bazie")
+            return
+
+        PDFtoGUIServiceFactory.backend("automator", "gui")(main_window).fill_form(data)
+        print(f"✓ Karta {card_no} wczytana z bazy")
+
 
     # Dodaj przycisk "Import z PDF" do GUI
     import_button = tk.Button(
@@ -187,6 +270,22 @@ def integrateWithGUI(main_window):
     )
     import_single_button.pack(side="left", padx=5)
 
+    # Przycisk Wczytaj kartę z bazy
+    load_card_button = tk.Button(
+        main_window.root,
+        text="🔎 Wczytaj kartę z bazy",
+        command=load_card_from_database,
+        font=("Arial", 10, "bold"),
+        bg="#FF9800",
+        fg="white",
+        padx=20,
+        pady=10
+    )
+    load_card_button.pack(side="left", padx=5)
+
+    # Przyciski wyłączane na czas importu w tle
+    batch_buttons = (import_button, import_single_button, load_card_button)
+
 
     print("✓ Dodano funkcję 'Import z PDF' do GUI")
 
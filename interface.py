@@ -1,9 +1,14 @@
 from abc import abstractmethod, ABC
 from pathlib import Path
+from typing import Iterator, Dict, List, Sequence
 
 from tempDataBase import PDFData
 
 
+class GUIStateLost(RuntimeError):
+    """Po przekroczeniu czasu oczekiwania na okno nie wiadomo, które okno ma fokus - partię trzeba przerwać"""
+
+
 class ITextExtractor(ABC):
     """Interface dla ekstrakcji tekstu"""
 
@@ -11,6 +16,10 @@ class ITextExtractor(ABC):
     def extract_text(self, file_path: Path) -> str:
         pass
 
+    def iter_pages(self, file_path: Path) -> Iterator[str]:
+        """Tekst strona po stronie (domyślnie cały dokument jako jeden kawałek)"""
+        yield self.extract_text(file_path)
+
 
 class IDataParser(ABC):
     """Interface dla parsowania danych"""
@@ -27,6 +36,10 @@ class IDataEnricher(ABC):
     def enrich(self, data: PDFData, filename: str) -> PDFData:
         pass
 
+    def enrich_many(self, batch: Sequence[PDFData], filenames: Sequence[str]) -> List[PDFData]:
+        """Wzbogacenie całej partii (domyślnie enrich dla każdego elementu)"""
+        return [self.enrich(data, filename) for data, filename in zip(batch, filenames)]
+
 
 class IGUIAutomator(ABC):
     """Interface dla automatyzacji GUI"""
@@ -37,4 +50,23 @@ class IGUIAutomator(ABC):
 
     @abstractmethod
     def generate_pdf(self) -> None:
-        pass
\ No newline at end of file
+        pass
+
+    def reset_form(self) -> None:
+        """Zapomnij stan formularza - następna karta zaczyna od czystego formularza"""
+        pass
+
+    def close(self) -> None:
+        """Koniec partii (np. przywrócenie ukrytego okna)"""
+        pass
+
+
+class IMetricsHook(ABC):
+    """Interface dla odbiorców metryk etapów (np. log, monitoring)"""
+
+    @abstractmethod
+    def on_stage(self, file_name: str, stage: str, values: Dict[str, float]) -> None:
+        pass
+
+    def on_batch_end(self, summary: Dict[str, object]) -> None:
+        pass
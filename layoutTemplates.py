@@ -0,0 +1,419 @@
+import json
+import os
+import re
+from dataclasses import dataclass, field, asdict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from interface import ITextExtractor, IDataParser
+from tempDataBase import PDFData
+
+
+# Nazwa pliku z nauczonymi szablonami układów - w folderze cache lub obok bazy (PDFtoGUIServiceFactory)
+STORE_NAME = "layout_templates.json"
+
+BBox = Tuple[float, float, float, float]
+
+
+@dataclass
+class FieldRegion:
+    """
+    Położenie pola na stronie: linia z etykietą i wartością (bbox) oraz sama etykieta (label_bbox).
+    optional = pole dopisane do szablonu później (było puste na karcie, z której go nauczono) -
+    nie służy do rozpoznawania układu, bo na części kart tego układu może go nie być.
+    """
+    page: int
+    bbox: BBox
+    label: str
+    label_bbox: BBox
+    optional: bool = False
+
+
+@dataclass
+class LayoutTemplate:
+    """
+    Szablon jednego układu karty: rozmiar strony i regiony pól PDFData.
+    absent = pola puste także w pełnym tekście karty tego układu - ich brak w wycinkach
+    nie wymusza już pełnej ekstrakcji.
+    """
+    name: str
+    page_size: Tuple[float, float]
+    fields: Dict[str, FieldRegion] = field(default_factory=dict)
+    absent: List[str] = field(default_factory=list)
+
+    # Tolerancja rozmiaru strony [pt] przy rozpoznawaniu
+    SIZE_TOLERANCE = 1.0
+    # Ile etykiet sprawdzamy przy rozpoznawaniu układu
+    ANCHORS = 3
+
+    @property
+    def last_page(self) -> int:
+        return max((region.page for region in self.fields.values()), default=1)
+
+    def required(self) -> List[str]:
+        """Pola z karty, z której nauczono szablon - muszą być w wycinkach"""
+        return [name for name, region in self.fields.items() if not region.optional]
+
+    def anchors(self) -> List[FieldRegion]:
+        regions = sorted(
+            (region for region in self.fields.values() if not region.optional),
+            key=lambda region: (region.page, region.label_bbox[1])
+        )
+        return regions[:self.ANCHORS]
+
+    def regions(self) -> List[Tuple[int, BBox]]:
+        """Regiony do wycięcia: pola z tej samej linii łączone w jeden prostokąt, od góry strony"""
+        merged: List[Tuple[int, List[float]]] = []
+        for region in sorted(self.fields.values(), key=lambda r: (r.page, r.bbox[1])):
+            last = merged[-1] if merged else None
+            if last is not None and last[0] == region.page and region.bbox[1] < last[1][3]:
+                box = last[1]
+                box[0], box[1] = min(box[0], region.bbox[0]), min(box[1], region.bbox[1])
+                box[2], box[3] = max(box[2], region.bbox[2]), max(box[3], region.bbox[3])
+            else:
+                merged.append((region.page, list(region.bbox)))
+        return [(page, tuple(box)) for page, box in merged]
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, values: Dict) -> "LayoutTemplate":
+        return cls(
+            name=values["name"],
+            page_size=tuple(values["page_size"]),
+            fields={
+                name: FieldRegion(
+                    region["page"], tuple(region["bbox"]), region["label"], tuple(region["label_bbox"]),
+                    region.get("optional", False)
+                )
+                for name, region in values["fields"].items()
+            },
+            absent=list(values.get("absent", [])),
+        )
+
+
+class TemplateStore:
+    """
+    Nauczone szablony układów w pliku JSON.
+
+    learn() zapisuje, gdzie na stronie leżą linie z polami PDFData (na podstawie słów z pdfplumber),
+    match() rozpoznaje układ otwartego PDF po rozmiarze strony i kilku etykietach.
+    Plik jest zapisywany atomowo i wczytywany ponownie po zmianie (kilka procesów puli).
+    """
+
+    # Tolerancja [pt] przy składaniu słów w linie
+    LINE_TOLERANCE = 3.0
+    # Margines [pt] dookoła wycinanych regionów
+    PADDING = 1.5
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.templates: List[LayoutTemplate] = []
+        self._mtime = None
+        self.reload()
+
+    def reload(self) -> None:
+        """Wczytuje plik, jeśli zmienił się od ostatniego odczytu"""
+        try:
+            mtime = self.path.stat().st_mtime
+        except OSError:
+            return
+        if mtime == self._mtime:
+            return
+        try:
+            payload = json.loads(self.path.read_text(encoding="utf-8"))
+            self.templates = [LayoutTemplate.from_dict(values) for values in payload.get("templates", [])]
+        except (OSError, ValueError, KeyError) as e:
+            print(f"⚠ Nie udało się wczytać szablonów {self.path}: {e}")
+            return
+        self._mtime = mtime
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        payload = {"templates": [template.to_dict() for template in self.templates]}
+        temp_path.write_text(json.dumps(payload, indent=2, ensure_ascii=False), encoding="utf-8")
+        os.replace(temp_path, self.path)
+        self._mtime = self.path.stat().st_mtime
+
+    def match(self, pdf) -> Optional[LayoutTemplate]:
+        """Szablon pasujący do otwartego dokumentu pdfplumber (None = nieznany układ)"""
+        self.reload()
+        return self._find(pdf)
+
+    def _find(self, pdf) -> Optional[LayoutTemplate]:
+        if not pdf.pages:
+            return None
+        first = pdf.pages[0]
+        for template in self.templates:
+            width, height = template.page_size
+            if abs(first.width - width) > LayoutTemplate.SIZE_TOLERANCE:
+                continue
+            if abs(first.height - height) > LayoutTemplate.SIZE_TOLERANCE:
+                continue
+            if len(pdf.pages) < template.last_page:
+                continue
+            if all(self._has_label(pdf.pages[anchor.page - 1], anchor) for anchor in template.anchors()):
+                return template
+        return None
+
+    def _has_label(self, page, region: FieldRegion) -> bool:
+        text = crop_text(page, region.label_bbox, self.PADDING)
+        return _squash(region.label) in _squash(text)
+
+    def learn(self, pdf, data: PDFData, name: Optional[str] = None) -> Optional[LayoutTemplate]:
+        """
+        Uczy szablon z otwartego dokumentu i danych odczytanych z pełnego tekstu.
+        Szablon jest zapisywany tylko wtedy, gdy wycięte regiony dają na tym samym dokumencie
+        te same wartości co pełny tekst.
+        """
+        if not pdf.pages:
+            return None
+        first = pdf.pages[0]
+        template = LayoutTemplate(
+            name=name or f"layout_{len(self.templates) + 1}", page_size=(float(first.width), float(first.height))
+        )
+        template.fields = self._locate(pdf, data)
+
+        if not template.fields or not self._verify(pdf, template, data):
+            return None
+
+        # Inny proces puli mógł w międzyczasie nauczyć ten sam układ
+        self.reload()
+        existing = self._find(pdf)
+        if existing is not None:
+            return existing
+
+        self.templates.append(template)
+        self.save()
+        print(f"  📐 Nauczono szablon układu '{template.name}' ({len(template.fields)} pól) → {self.path}")
+        return template
+
+    def extend(self, pdf, template: LayoutTemplate, data: PDFData) -> List[str]:
+        """
+        Dopisuje do szablonu pola, których w nim brak, a które mają wartość w data (z pełnego tekstu).
+        Nowe pola są opcjonalne. Zapis tylko po weryfikacji wycinków jak w learn(); zwraca dopisane pola.
+        """
+        names = [name for name in self._field_names() if name not in template.fields]
+        found = self._locate(pdf, data, names)
+        if not found:
+            return []
+
+        candidate = LayoutTemplate(template.name, template.page_size, dict(template.fields))
+        for region in found.values():
+            region.optional = True
+        candidate.fields.update(found)
+        if not self._verify(pdf, candidate, data):
+            return []
+
+        # Szablon mógł zostać w międzyczasie zmieniony przez inny proces puli
+        self.reload()
+        current = next((t for t in self.templates if t.name == template.name), None)
+        if current is None:
+            return []
+        added = [name for name in found if name not in current.fields]
+        for name in added:
+            current.fields[name] = found[name]
+        if added:
+            self.save()
+            print(f"  📐 Szablon '{current.name}' uzupełniony o pola: {', '.join(added)}")
+        return added
+
+    def mark_absent(self, template: LayoutTemplate, names: List[str]) -> List[str]:
+        """Zapamiętuje pola puste w pełnym tekście karty tego układu; zwraca nowo dopisane"""
+        self.reload()
+        current = next((t for t in self.templates if t.name == template.name), None)
+        if current is None:
+            return []
+        added = [name for name in names if name not in current.absent]
+        if added:
+            current.absent.extend(added)
+            self.save()
+            print(f"  📐 Szablon '{current.name}': pola bez wartości w tym układzie: {', '.join(added)}")
+        return added
+
+    @staticmethod
+    def _field_names() -> List[str]:
+        from model import SinglePassDataParser
+        return [name for name, _, _ in SinglePassDataParser.TEXT_FIELDS] + \
+            [name for name, _ in SinglePassDataParser.UNIT_FIELDS]
+
+    def _locate(self, pdf, data: PDFData, names: Optional[List[str]] = None) -> Dict[str, FieldRegion]:
+        """Regiony pól z wartością w data (opcjonalnie tylko z listy names)"""
+        from model import SinglePassDataParser, UNIT_MAP
+
+        wanted = {}
+        for field_name, label, _ in SinglePassDataParser.TEXT_FIELDS:
+            if getattr(data, field_name, "") not in ("", None) and (names is None or field_name in names):
+                wanted[field_name] = re.compile(rf"({label}\s*:)", re.IGNORECASE)
+        for field_name, param in SinglePassDataParser.UNIT_FIELDS:
+            if getattr(data, field_name, None) not in ("", None) and (names is None or field_name in names):
+                # Etykietą pola jednostkowego jest sama jednostka (wartość zmienia się między kartami)
+                wanted[field_name] = re.compile(rf"({re.escape(UNIT_MAP[param])})\s+[\d,]+")
+
+        regions: Dict[str, FieldRegion] = {}
+        if not wanted:
+            return regions
+        for page in pdf.pages:
+            for words in self._lines(page):
+                text, starts = _line_text(words)
+                for field_name, pattern in list(wanted.items()):
+                    found = pattern.search(text)
+                    if found is None:
+                        continue
+                    label_words = [
+                        word for word, start in zip(words, starts) if found.start(1) <= start < found.end(1)
+                    ] or words[:1]
+                    top = min(word["top"] for word in words)
+                    bottom = max(word["bottom"] for word in words)
+                    regions[field_name] = FieldRegion(
+                        page=page.page_number,
+                        bbox=(float(words[0]["x0"]), float(top), float(page.width), float(bottom)),
+                        label=" ".join(word["text"] for word in label_words),
+                        label_bbox=(
+                            float(label_words[0]["x0"]), float(min(w["top"] for w in label_words)),
+                            float(label_words[-1]["x1"]), float(max(w["bottom"] for w in label_words)),
+                        ),
+                    )
+                    del wanted[field_name]
+            if not wanted:
+                break
+        return regions
+
+    def _lines(self, page) -> List[List[dict]]:
+        """Słowa strony złożone w linie (od góry, w linii od lewej)"""
+        lines: List[List[dict]] = []
+        for word in sorted(page.extract_words(), key=lambda w: (w["top"], w["x0"])):
+            if lines and abs(lines[-1][0]["top"] - word["top"]) <= self.LINE_TOLERANCE:
+                lines[-1].append(word)
+            else:
+                lines.append([word])
+        return [sorted(line, key=lambda w: w["x0"]) for line in lines]
+
+    def _verify(self, pdf, template: LayoutTemplate, data: PDFData) -> bool:
+        from model import SinglePassDataParser
+        cropped = SinglePassDataParser().parse(extract_regions(pdf, template, self.PADDING))
+        return all(getattr(cropped, name) == getattr(data, name) for name in template.fields)
+
+
+def crop_text(page, bbox: BBox, padding: float = 0.0) -> str:
+    """Tekst z prostokąta strony (przycięty do granic strony)"""
+    x0, top, x1, bottom = bbox
+    box = (
+        max(page.bbox[0], x0 - padding), max(page.bbox[1], top - padding),
+        min(page.bbox[2], x1 + padding), min(page.bbox[3], bottom + padding),
+    )
+    if box[0] >= box[2] or box[1] >= box[3]:
+        return ""
+    return page.crop(box).extract_text() or ""
+
+
+def extract_regions(pdf, template: LayoutTemplate, padding: float = 0.0) -> str:
+    """Tekst tylko z regionów szablonu, linia po linii w kolejności strony"""
+    parts = []
+    for page_number, bbox in template.regions():
+        text = crop_text(pdf.pages[page_number - 1], bbox, padding)
+        if text:
+            parts.append(text)
+    return "\n".join(parts)
+
+
+def _line_text(words: List[dict]) -> Tuple[str, List[int]]:
+    """Tekst linii i pozycje początku każdego słowa w tym tekście"""
+    starts, position = [], 0
+    for word in words:
+        starts.append(position)
+        position += len(word["text"]) + 1
+    return " ".join(word["text"] for word in words), starts
+
+
+def _squash(text: str) -> str:
+    return re.sub(r"\s+", "", text).lower()
+
+
+class TemplateTextExtractor(ITextExtractor):
+    """
+    Ekstrakcja wycinkowa dla znanych układów kart.
+
+    Rozpoznany układ → tekst tylko z regionów pól (pozostałe strony i obszary nie są analizowane).
+    Nieznany układ, brak pola szablonu w wycinkach albo puste pole, którego brak w tym układzie
+    nie jest potwierdzony (LayoutTemplate.absent) → pełny tekst przez ekstraktor zapasowy.
+    Przy learn=True z pełnego tekstu uczony jest nowy szablon, a znany szablon jest uzupełniany
+    o pola, które były puste na karcie, z której go nauczono, oraz o pola puste także w pełnym tekście.
+    """
+
+    # Zmień przy każdej zmianie sposobu wycinania - unieważnia wpisy w PDFCache
+    VERSION = "3"
+    # Opcje wpływające na wynik - część klucza PDFCache
+    CACHE_OPTIONS = ("data_parser", "fallback")
+
+    def __init__(
+            self,
+            max_pages: Optional[int] = None,
+            store_path: Optional[Path] = None,
+            learn: bool = True,
+            data_parser: Optional[IDataParser] = None,
+            fallback: Optional[ITextExtractor] = None,
+            low_memory: bool = False,
+            max_rss_mb: Optional[float] = None
+    ):
+        """
+        Args:
+            max_pages: Limit stron dla ekstrakcji pełnego tekstu
+            store_path: Plik JSON z szablonami - wymagany (fabryka: folder cache lub obok bazy)
+            learn: Ucz nowe szablony z plików o nieznanym układzie
+            data_parser: Parser do kontroli wycinków i uczenia (domyślnie SinglePassDataParser)
+            fallback: Ekstraktor pełnego tekstu (domyślnie PDFTextExtractor)
+        """
+        from model import PDFTextExtractor, SinglePassDataParser
+
+        if store_path is None:
+            raise ValueError("TemplateTextExtractor wymaga store_path (plik szablonów układów)")
+        self.store_path = Path(store_path)
+        self.learn = learn
+        self.data_parser = data_parser or SinglePassDataParser()
+        self.fallback = fallback or PDFTextExtractor(max_pages, low_memory=low_memory, max_rss_mb=max_rss_mb)
+        self.template_hits = 0
+        self.fallback_count = 0
+        self._store: Optional[TemplateStore] = None
+
+    @property
+    def store(self) -> TemplateStore:
+        # Tworzony leniwie - także po przesłaniu ekstraktora do procesu puli
+        if self._store is None:
+            self._store = TemplateStore(self.store_path)
+        return self._store
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        state["_store"] = None
+        return state
+
+    def extract_text(self, file_path: Path) -> str:
+        import pdfplumber  # import leniwy - ciężka zależność
+
+        with pdfplumber.open(file_path) as pdf:
+            template = self.store.match(pdf)
+            if template is not None:
+                text = extract_regions(pdf, template, TemplateStore.PADDING)
+                data = self.data_parser.parse(text)
+                if all(getattr(data, name) not in ("", None) for name in template.required()):
+                    # Pola potwierdzone jako puste w tym układzie nie wymuszają pełnego tekstu
+                    if all(name in template.absent for name in data.missing_fields()):
+                        self.template_hits += 1
+                        return text
+                else:
+                    print(f"  ℹ {Path(file_path).name}: niepełne pola w szablonie '{template.name}' - pełny tekst")
+
+            # Pełny tekst zawiera też pola z wycinków (zweryfikowane przy uczeniu jako identyczne)
+            self.fallback_count += 1
+            text = self.fallback.extract_text(file_path)
+            if self.learn:
+                data = self.data_parser.parse(text)
+                if template is None:
+                    self.store.learn(pdf, data)
+                else:
+                    self.store.extend(pdf, template, data)
+                    self.store.mark_absent(template, data.missing_fields())
+            return text
@@ -1,51 +1,149 @@
+"""
+Import wsadowy bez GUI: PDF → dane → (Excel) → JSONL/CSV, np. nocą na serwerze bez ekranu.
+
+Użycie:
+    python main.py pdfs_input --output wyniki.jsonl --jobs 4 --excel parametry.xlsx
+    python main.py archiwum --output wyniki.csv --exclude "*_old*" --db pdf_import.db
+    python main.py archiwum --output - > wyniki.jsonl      (komunikaty idą wtedy na stderr)
+
+Kod wyjścia: 0 - wszystkie pliki przetworzone, 1 - co najmniej jeden błąd, 2 - złe argumenty.
+"""
+import argparse
+import contextlib
+import csv
+import json
+import sys
+import time
 from pathlib import Path
+from typing import Dict, List, Optional
 
+from model import DEFAULT_INCLUDE, PDFResult, PDFtoGUIServiceFactory
+from pdfDataBatch import ALL_FIELDS
 
 
+STAGES = ("extract", "parse", "enrich")
 
-"""
-def main():
-    #Główna funkcja - import danych z PDF do bazy
-
-    # === KONFIGURACJA ===
-    PDF_FOLDER = Path("pdfs_input")
-    EXCEL_FILE = Path("parametry.xlsx")  # Opcjonalnie
-    PREPARED_BY = "Twoje Imię Nazwisko"  # Zmień na swoje dane
-
-    # Walidacja
-    if not PDF_FOLDER.exists():
-        print(f"❌ Folder {PDF_FOLDER} nie istnieje!")
-        PDF_FOLDER.mkdir(parents=True)
-        print(f"✓ Utworzono folder {PDF_FOLDER}")
-        print(f"  Wrzuć tam pliki PDF i uruchom ponownie")
-        return
-
-    # Tworzenie serwisu
-    excel_path = EXCEL_FILE if EXCEL_FILE.exists() else None
-    service = PDFImportServiceFactory.create(excel_path)
-
-    # Import
-    print("🚀 IMPORT DANYCH Z PDF DO BAZY")
-    print("=" * 70)
-    print("Uwaga: Zapisywane są TYLKO dane z PDF.")
-    print("Pozostałe pola uzupełni program GUI po wczytaniu.\n")
 
-    stats = service.import_directory(PDF_FOLDER, PREPARED_BY)
+class ResultWriter:
+    """Zapis wyników strumieniowo (wiersz po wierszu) jako JSONL lub CSV - format z rozszerzenia pliku"""
+
+    def __init__(self, output: str, stdout=None):
+        self.format = "csv" if output.lower().endswith(".csv") else "jsonl"
+        self._stdout = stdout or sys.stdout
+        self._file = self._stdout if output == "-" else open(output, "w", newline="", encoding="utf-8")
+        self._csv = None
+        if self.format == "csv":
+            self._csv = csv.writer(self._file)
+            self._csv.writerow(("file", "ok", "error") + ALL_FIELDS + tuple(f"{stage}_s" for stage in STAGES))
+
+    def write(self, result: PDFResult) -> None:
+        values = result.data.to_dict() if result.data is not None else {}
+        error = f"{type(result.error).__name__}: {result.error}" if result.error is not None else None
+        timings = {stage: result.timings[stage]["wall_s"] for stage in STAGES if stage in result.timings}
+
+        if self._csv is not None:
+            self._csv.writerow(
+                (str(result.path), int(result.ok), error or "")
+                + tuple("" if values.get(name) is None else values.get(name) for name in ALL_FIELDS)
+                + tuple(timings.get(stage, "") for stage in STAGES)
+            )
+        else:
+            record = {"file": str(result.path), "ok": result.ok, "error": error, "data": values, "timings": timings}
+            self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._file.flush()  # wyniki widoczne od razu, także przy przerwanym przebiegu
+
+    def close(self) -> None:
+        if self._file is not self._stdout:
+            self._file.close()
 
-    # Podsumowanie
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Import danych z kart PDF bez GUI (JSONL/CSV)")
+    parser.add_argument("input", type=Path, help="Folder z plikami PDF (przeszukiwany rekurencyjnie)")
+    parser.add_argument("-o", "--output", default="wyniki.jsonl",
+                        help="Plik wyników .jsonl lub .csv, '-' = stdout (domyślnie wyniki.jsonl)")
+    parser.add_argument("-j", "--jobs", type=int, default=0, help="Liczba procesów ekstrakcji (0 = szeregowo)")
+    parser.add_argument("--excel", type=Path, help="Arkusz Excel z dodatkowymi danymi")
+    parser.add_argument("--prepared-by", default="", help="Wartość pola prepared_by")
+    parser.add_argument("--db", type=Path, help="Zapis danych także do bazy SQLite")
+    parser.add_argument("--cache-dir", type=Path, help="Cache tekstu i danych między przebiegami")
+    parser.add_argument("--metrics-dir", type=Path, help="Folder na metryki etapów (JSON + CSV)")
+    parser.add_argument("--extractor", default="pdfplumber",
+                        choices=sorted(PDFtoGUIServiceFactory.BACKENDS["extractor"]), help="Backend ekstrakcji")
+    parser.add_argument("--include", action="append", help=f"Wzorzec plików (domyślnie {DEFAULT_INCLUDE[0]})")
+    parser.add_argument("--exclude", action="append", default=[], help="Pomijane pliki/foldery (wzorzec fnmatch)")
+    parser.add_argument("--no-recursive", action="store_true", help="Tylko pliki bezpośrednio w folderze")
+    parser.add_argument("--max-rss-mb", type=float, help="Limit pamięci na jeden PDF")
+    parser.add_argument("--timeout", type=float,
+                        help="Limit czasu na jeden PDF [s] - zawieszony proces roboczy jest zabijany")
+    parser.add_argument("--worker-memory-mb", type=float,
+                        help="Limit pamięci procesu roboczego - po przekroczeniu proces jest zabijany")
+    parser.add_argument("--profile-dir", type=Path, help="Profiluj najwolniejsze pliki (cProfile) i zapisz raport")
+    parser.add_argument("--profile-threshold", type=float, help="Profiluj też każdy plik wolniejszy niż [s]")
+    parser.add_argument("--profile-top", type=int, default=5, help="Liczba najwolniejszych plików do profilowania")
+    return parser.parse_args(argv)
+
+
+def run(args: argparse.Namespace, stdout=None) -> Dict[str, int]:
+    service = PDFtoGUIServiceFactory.create(
+        None, args.excel, workers=args.jobs, streaming=True, cache_dir=args.cache_dir,
+        db_path=args.db, metrics_dir=args.metrics_dir, extractor=args.extractor,
+        low_memory=True, max_rss_mb=args.max_rss_mb, profile_dir=args.profile_dir,
+        profile_threshold_s=args.profile_threshold, profile_top_n=args.profile_top,
+        file_timeout_s=args.timeout, worker_memory_mb=args.worker_memory_mb,
+        quiet_stdout=args.output == "-"
+    )
+
+    stats = {'success': 0, 'failed': 0}
+    writer = ResultWriter(args.output, stdout)
+    started = time.perf_counter()
+    try:
+        for result in service.iter_process(
+                args.input, args.prepared_by, args.include or DEFAULT_INCLUDE, args.exclude,
+                recursive=not args.no_recursive
+        ):
+            writer.write(result)
+            if result.ok:
+                stats['success'] += 1
+            else:
+                stats['failed'] += 1
+                print(f"  ✗ {result.path}: {result.error}")
+    finally:
+        writer.close()
+
+    elapsed = time.perf_counter() - started
+    total = stats['success'] + stats['failed']
     print("\n" + "=" * 70)
     print("📊 PODSUMOWANIE")
     print("=" * 70)
     print(f"✓ Sukces: {stats['success']}")
     print(f"✗ Błędy: {stats['failed']}")
-    print(f"\n💾 Dane zapisane w bazie danych SQLite")
-    print("\n📋 NASTĘPNE KROKI:")
-    print("1. Uruchom GUI swojego programu")
-    print("2. Wczytaj kartę po numerze (Card No)")
-    print("3. Program automatycznie uzupełni domyślne wartości")
-    print("4. Kliknij 'Generuj PDF'")
-"""
+    print(f"⏱ {total} plików w {elapsed:.1f} s ({total / elapsed if elapsed else 0:.1f} plików/s)")
+    print(f"💾 Wyniki: {args.output}")
+    return stats
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    if not args.input.is_dir():
+        print(f"❌ Folder {args.input} nie istnieje!", file=sys.stderr)
+        return 2
+    if args.extractor == "template" and args.cache_dir is None and args.db is None:
+        print("❌ --extractor template wymaga --cache-dir lub --db (tam zapisywane są szablony)", file=sys.stderr)
+        return 2
+    if args.excel is not None and not args.excel.exists():
+        print(f"❌ Plik Excel {args.excel} nie istnieje!", file=sys.stderr)
+        return 2
+
+    # Przy wynikach na stdout komunikaty postępu idą na stderr (procesy robocze - quiet_stdout w run)
+    stdout = sys.stdout
+    redirect = contextlib.redirect_stdout(sys.stderr) if args.output == "-" else contextlib.nullcontext()
+    with redirect:
+        print("🚀 IMPORT DANYCH Z PDF (bez GUI)")
+        print("=" * 70)
+        stats = run(args, stdout)
+    return 1 if stats['failed'] else 0
+
 
 if __name__ == "__main__":
-    print("Ten skrypt wymaga integracji z GUI.")
-    print("Użyj: integrate_with_gui(main_window)")
\ No newline at end of file
+    sys.exit(main())
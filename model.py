@@ -1,11 +1,23 @@
+import fnmatch
+import hashlib
+import importlib
+import json
+import os
 import time
+from collections import deque
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Optional, Dict
-import re, pdfplumber
+from typing import Optional, Dict, Iterator, List, Tuple, Iterable
+import re
+import sys
 
-from excelExtract import ExcelDataEnricher
-from guiAutomator import MainWindowGUIAutomator
-from interface import ITextExtractor, IDataParser, IDataEnricher, IGUIAutomator
+from cardDeduplicator import CardDeduplicator, DedupReport
+from interface import ITextExtractor, IDataParser, IDataEnricher, IGUIAutomator, IMetricsHook, GUIStateLost
+from pdfCache import PDFCache, file_fingerprint
+from pdfStorage import PDFDataRepository
+from resumeJournal import ProcessingJournal
+from slowProfiler import SlowFileProfiler
+from stageMetrics import StageMetrics, StageTimer, current_rss, rss_available
 from tempDataBase import PDFData
 
 
@@ -16,23 +28,80 @@ UNIT_MAP = {
     "Grub./Thickness": r"μm"
 }
 
+# Domyślne wzorce plików dla iter_pdf_files / iter_process
+DEFAULT_INCLUDE = ("*.pdf",)
+
+# Nazwa dziennika postępu zapisywanego w katalogu wejściowym (process_directory z resume=True)
+JOURNAL_NAME = ".pdf_import_journal.jsonl"
+
+
+class MemoryLimitExceeded(MemoryError):
+    """Ekstrakcja jednego pliku przekroczyła limit pamięci (max_rss_mb)"""
+
+
+class RSSLimit:
+    """Limit przyrostu RSS procesu w trakcie ekstrakcji jednego pliku"""
+
+    def __init__(self, file_path: Path, max_rss_mb: float):
+        self.file_path = Path(file_path)
+        self.limit = int(max_rss_mb * 1024 * 1024)
+        self.baseline = current_rss()
+
+    def check(self, page_number: int) -> None:
+        growth = current_rss() - self.baseline
+        if growth > self.limit:
+            raise MemoryLimitExceeded(
+                f"{self.file_path.name}: +{growth / 2 ** 20:.0f} MB RSS po stronie {page_number} "
+                f"(limit {self.limit / 2 ** 20:.0f} MB)"
+            )
+
 
 class PDFTextExtractor(ITextExtractor):
     """Ekstrakcja tekstu z PDF"""
 
+    # Opcje wpływające na wynik - część klucza PDFCache
+    CACHE_OPTIONS = ("max_pages",)
+
+    def __init__(self, max_pages: Optional[int] = None, low_memory: bool = False,
+                 max_rss_mb: Optional[float] = None):
+        """
+        Args:
+            max_pages: Opcjonalny limit stron (np. pomija długie załączniki)
+            low_memory: Zwalniaj obiekty strony (znaki, układ) zaraz po odczytaniu jej tekstu
+            max_rss_mb: Limit przyrostu pamięci na jeden plik - po przekroczeniu MemoryLimitExceeded
+        """
+        self.max_pages = max_pages
+        self.low_memory = low_memory
+        self.max_rss_mb = max_rss_mb
+
     def extract_text(self, file_path: Path) -> str:
-        text_parts = []
-        with pdfplumber.open(file_path) as pdf:
+        return "\n".join(self.iter_pages(file_path))
+
+    def iter_pages(self, file_path: Path) -> Iterator[str]:
+        """Leniwie zwraca tekst kolejnych stron - przerwanie iteracji zamyka plik"""
+        import pdfplumber  # import leniwy - ciężka zależność, ładowana dopiero przy pierwszym PDF
+
+        limit = RSSLimit(file_path, self.max_rss_mb) if self.max_rss_mb else None
+        page_numbers = None if self.max_pages is None else range(1, self.max_pages + 1)
+
+        with pdfplumber.open(file_path, pages=page_numbers) as pdf:
             for page in pdf.pages:
                 page_text = page.extract_text()
+                if self.low_memory:
+                    # pdfplumber trzyma znaki i układ każdej strony do zamknięcia dokumentu
+                    page.close()
+                if limit is not None:
+                    limit.check(page.page_number)
                 if page_text:
-                    text_parts.append(page_text)
-        return "\n".join(text_parts)
+                    yield page_text
 
 
 class RegexDataParser(IDataParser):
     """Parsowanie danych z tekstu PDF"""
 
+    # Zmień przy każdej zmianie reguł - unieważnia wpisy w PDFCache
+    VERSION = "1"
+
     def parse(self, text: str) -> PDFData:
         data = PDFData()
 
@@ -97,6 +166,275 @@ class RegexDataParser(IDataParser):
         return None
 
 
+class SinglePassDataParser(IDataParser):
+    """
+    Parsowanie jednym przebiegiem po tekście (wynik taki sam jak w RegexDataParser).
+
+    Każda etykieta kończy się dwukropkiem, więc tekst dzielimy na tokeny po dwukropkach
+    i dla każdego sprawdzamy tylko etykiety o pasującej końcówce. Jednostki z UNIT_MAP
+    wyszukuje jeden wspólny, prekompilowany wzorzec. Koszt nie rośnie z liczbą pól.
+    """
+
+    # Zmień przy każdej zmianie reguł - unieważnia wpisy w PDFCache
+    VERSION = "1"
+
+    # (pole PDFData, etykieta, wzorzec wartości za dwukropkiem) - te same reguły co w RegexDataParser
+    TEXT_FIELDS = (
+        ("card_no", r"Card No", r"[^\n]+"),
+        ("article_index", r"Article index", r"[^\n]+"),
+        ("client_article_index", r"Client'?s?\s+article index", r"[^\n]+"),
+        ("article_description", r"Article description", r"[^\n]+"),
+        ("product_structure", r"Product structure", r"[^\n]+?)(?:\n|Structure"),
+        ("structure_thickness", r"Structure thickness", r"[^\n]+"),
+        ("structure_description", r"Structure description", r"[^\n]+?)(?:\n|Chemical"),
+        ("chemical_composition", r"Chemical composition", r"[^\n]+"),
+        ("print_type", r"Print type", r"[^\n]+"),
+        ("number_of_colours", r"Number of colours", r"[^\n]+?)(?:\n|Solid"),
+        ("solid_lacquer", r"Solid/Lacquer", r"[^\n]+"),
+        ("winding_code", r"Winding code", r"[^\n]+?)(?:\n|Core"),
+        ("core", r"Core", r"[^\n]+"),
+        ("external_diameter", r"External diameter", r"[^\n]+?)(?:\n|Core"),
+        ("width_of_core", r"Width of core", r"[^\n]+"),
+        ("core_submission", r"Core submission", r"[^\n]+"),
+    )
+
+    # (pole PDFData, nazwa parametru w UNIT_MAP) - wartości szukane po jednostce
+    UNIT_FIELDS = (
+        ("gramatura", "Gramatur/Weight"),
+        ("otr", "OTR"),
+        ("wvtr", "WVTR"),
+        ("thickness", "Grub./Thickness"),
+    )
+
+    # Ile znaków przed dwukropkiem może zajmować etykieta
+    LABEL_WINDOW = 64
+
+    _THICKNESS_PAIR = re.compile(r"Structure thickness\s*:\s*(\d+)\s*/\s*(\d+)")
+    _WHITESPACE = re.compile(r"\s+")
+
+    def __init__(self):
+        self._labels = {}
+        self._values = {}
+        self._by_suffix = {}
+        for name, label, value in self.TEXT_FIELDS:
+            self._labels[name] = re.compile(rf"{label}\Z", re.IGNORECASE)
+            self._values[name] = re.compile(rf"\s*({value})", re.IGNORECASE)
+            self._by_suffix.setdefault(label[-4:].lower(), []).append(name)
+
+        # Dłuższe jednostki najpierw ("g/m2d" przed "g/m2")
+        units = sorted(((UNIT_MAP[param], name) for name, param in self.UNIT_FIELDS), reverse=True)
+        self._unit_fields = {f"u{i}": name for i, (_, name) in enumerate(units)}
+        self._units = re.compile(
+            "|".join(rf"{re.escape(unit)}\s+(?P<u{i}>[\d,]+)" for i, (unit, _) in enumerate(units))
+        )
+
+    def parse(self, text: str) -> PDFData:
+        values = self.scan(text)
+        data = PDFData()
+
+        for name, _, _ in self.TEXT_FIELDS:
+            setattr(data, name, values.get(name, ""))
+        for name, _ in self.UNIT_FIELDS:
+            setattr(data, name, values.get(name))
+
+        data.thickness1, data.thickness2 = values.get("thickness_pair", ("15", "50"))
+        return data
+
+    def scan(self, text: str) -> Dict[str, object]:
+        """Jeden przebieg po tekście → mapa pole -> wartość (pierwsze trafienie)"""
+        values = {}
+        wanted = len(self.TEXT_FIELDS) + 1  # + para grubości ze "Structure thickness"
+
+        colon = text.find(":")
+        while colon != -1 and len(values) < wanted:
+            end = colon
+            while end and text[end - 1].isspace():
+                end -= 1
+
+            for name in self._by_suffix.get(text[max(0, end - 4):end].lower(), ()):
+                if name in values and name != "structure_thickness":
+                    continue
+                label = self._labels[name].search(text, max(0, end - self.LABEL_WINDOW), end)
+                if label is None:
+                    continue
+
+                if name == "structure_thickness" and "thickness_pair" not in values:
+                    pair = self._THICKNESS_PAIR.match(text, label.start())
+                    if pair:
+                        values["thickness_pair"] = (pair.group(1), pair.group(2))
+
+                if name not in values:
+                    match = self._values[name].match(text, colon + 1)
+                    if match:
+                        values[name] = self._WHITESPACE.sub(" ", match.group(1).strip())
+
+            colon = text.find(":", colon + 1)
+
+        for match in self._units.finditer(text):
+            name = self._unit_fields[match.lastgroup]
+            if name not in values:
+                values[name] = float(match.group(match.lastgroup).replace(",", "."))
+                if len(values) == wanted + len(self.UNIT_FIELDS):
+                    break
+
+        return values
+
+
+def iter_pdf_files(directory: Path, include: Iterable[str] = DEFAULT_INCLUDE, exclude: Iterable[str] = (),
+                   recursive: bool = True) -> Iterator[Path]:
+    """
+    Leniwe przejście po katalogu (os.scandir) - pliki pasujące do include i niepasujące do exclude.
+
+    Wzorce fnmatch są sprawdzane z nazwą i ze ścieżką względną (np. "*.pdf", "archiwum/*").
+    Katalog pasujący do exclude jest pomijany w całości. W obrębie katalogu kolejność alfabetyczna,
+    w pamięci jest tylko lista bieżącego katalogu i stos katalogów do odwiedzenia.
+    Dowiązania do katalogów są odwiedzane raz - pętla dowiązań (np. link do katalogu nadrzędnego)
+    nie zapętla przejścia, bo katalogi są rozpoznawane po (st_dev, st_ino).
+    """
+    include, exclude = tuple(include), tuple(exclude)
+    root = Path(directory)
+
+    def matches(entry: os.DirEntry, patterns: Tuple[str, ...]) -> bool:
+        relative = Path(entry.path).relative_to(root).as_posix()
+        return any(fnmatch.fnmatch(entry.name, p) or fnmatch.fnmatch(relative, p) for p in patterns)
+
+    def first_visit(path) -> bool:
+        # os.stat zamiast DirEntry.stat - na Windows tylko on wypełnia st_ino
+        try:
+            info = os.stat(path)
+        except OSError:
+            return False
+        key = (info.st_dev, info.st_ino)
+        if key in visited:
+            return False
+        visited.add(key)
+        return True
+
+    visited = set()
+    first_visit(root)
+    stack = [root]
+    while stack:
+        with os.scandir(stack.pop()) as entries:
+            entries = sorted(entries, key=lambda e: e.name)
+
+        subdirectories = []
+        for entry in entries:
+            if matches(entry, exclude):
+                continue
+            if entry.is_dir():
+                if recursive and first_visit(entry.path):
+                    subdirectories.append(Path(entry.path))
+            elif entry.is_file() and matches(entry, include):
+                yield Path(entry.path)
+
+        stack.extend(reversed(subdirectories))  # podkatalogi w kolejności alfabetycznej
+
+
+@dataclass
+class PDFResult:
+    """Wynik przetwarzania jednego pliku (iter_process)"""
+    path: Path
+    data: Optional[PDFData] = None
+    error: Optional[Exception] = None
+    timings: Dict[str, Dict[str, float]] = field(default_factory=dict)
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def merge_missing(data: PDFData, page_data: PDFData) -> PDFData:
+    """
+    Uzupełnia puste pola data wartościami z page_data (pierwsze trafienie wygrywa - jak przy
+    parsowaniu całego tekstu). Grubości warstw idą razem z "structure_thickness".
+    """
+    for name in data.missing_fields():
+        value = getattr(page_data, name, "")
+        if value in ("", None):
+            continue
+        setattr(data, name, value)
+        if name == "structure_thickness":
+            for pair_name in ("thickness1", "thickness2"):
+                if hasattr(page_data, pair_name):
+                    setattr(data, pair_name, getattr(page_data, pair_name))
+    return data
+
+
+def stdout_to_stderr() -> None:
+    """Inicjalizator procesu roboczego: print() idzie na stderr (stdout zarezerwowany na wyniki)"""
+    sys.stdout = sys.stderr
+
+
+def parse_page(data_parser: IDataParser, page_text: str) -> PDFData:
+    """Parsowanie jednej strony - z końcem linii jak przy łączeniu stron w cały tekst"""
+    return data_parser.parse(page_text + "\n")
+
+
+def extract_and_parse(
+        text_extractor: ITextExtractor,
+        data_parser: IDataParser,
+        pdf_path: Path,
+        streaming: bool = False,
+        cache: Optional[PDFCache] = None
+) -> Tuple[PDFData, Dict[str, Dict[str, float]]]:
+    """
+    Etapy 1-2: ekstrakcja tekstu i parsowanie.
+    Funkcja modułowa, żeby dało się ją wysłać do puli procesów.
+
+    Args:
+        streaming: Parsuj każdą stronę raz (merge_missing) i przerwij ekstrakcję,
+                   gdy wszystkie pola PDFData są już wypełnione
+        cache: Opcjonalny cache - niezmieniony plik nie jest ponownie czytany
+
+    Returns:
+        (dane, pomiary etapów "extract" i "parse")
+    """
+    extract_timer = StageTimer()
+    parse_timer = StageTimer()
+
+    with extract_timer:
+        key = None
+        cached = None
+        if cache is not None:
+            key = cache.make_key(pdf_path, text_extractor, data_parser, streaming)
+            cached = cache.get(key)
+
+    if cached is not None:
+        print(f"  ✓ {pdf_path.name}: dane z cache")
+        return cached[1], {"extract": extract_timer.as_dict(), "parse": parse_timer.as_dict()}
+
+    if not streaming:
+        with extract_timer:
+            text = text_extractor.extract_text(pdf_path)
+        with parse_timer:
+            data = data_parser.parse(text)
+    else:
+        text_parts = []
+        with parse_timer:
+            data = data_parser.parse("")  # puste pola + wartości domyślne parsera
+        pages = iter(text_extractor.iter_pages(pdf_path))
+        try:
+            while True:
+                with extract_timer:
+                    page_text = next(pages, None)
+                if page_text is None:
+                    break
+                text_parts.append(page_text)
+                with parse_timer:
+                    merge_missing(data, parse_page(data_parser, page_text))
+                if not data.missing_fields():
+                    break  # pozostałe strony nie są czytane
+        finally:
+            if hasattr(pages, "close"):
+                pages.close()
+        text = "\n".join(text_parts)
+
+    if cache is not None:
+        with extract_timer:
+            cache.put(key, text, data)
+    return data, {"extract": extract_timer.as_dict(), "parse": parse_timer.as_dict()}
+
+
 # ============================================================================
 # FACADE - Główny serwis
 # ============================================================================
@@ -104,17 +442,83 @@ class RegexDataParser(IDataParser):
 class PDFtoGUIService:
     """Facade: Automatyczny przepływ PDF → GUI → PDF"""
 
+    # Ile sparsowanych kart idzie do jednego enrich_many - jedno złączenie z Excelem na każde
+    # ENRICH_BATCH kart (np. 1000 kart = 16 złączeń), żeby GUI nie czekało na sparsowanie całej partii
+    ENRICH_BATCH = 64
+
     def __init__(
             self,
             text_extractor: ITextExtractor,
             data_parser: IDataParser,
             data_enricher: IDataEnricher,
-            gui_automator: IGUIAutomator
+            gui_automator: Optional[IGUIAutomator],
+            workers: int = 0,
+            queue_size: Optional[int] = None,
+            streaming: bool = False,
+            cache: Optional[PDFCache] = None,
+            repository: Optional[PDFDataRepository] = None,
+            metrics_dir: Optional[Path] = None,
+            metrics_hooks: Iterable[IMetricsHook] = (),
+            deduplicator: Optional[CardDeduplicator] = None,
+            profiler: Optional[SlowFileProfiler] = None,
+            file_timeout_s: Optional[float] = None,
+            worker_memory_mb: Optional[float] = None,
+            quiet_stdout: bool = False
     ):
+        """
+        Args:
+            workers: Liczba procesów do ekstrakcji/parsowania (0 lub 1 = szeregowo)
+            queue_size: Ile sparsowanych plików może czekać na GUI (domyślnie 2 * workers)
+            streaming: Czytaj strony leniwie i przerwij, gdy wszystkie pola są wypełnione
+            cache: Cache tekstu i PDFData na dysku (pomija ponowną ekstrakcję)
+            repository: Baza SQLite, do której zapisywane są sparsowane dane
+            metrics_dir: Folder na metryki etapów (JSON + CSV) po każdej partii
+            metrics_hooks: Dodatkowi odbiorcy zdarzeń z pomiarami etapów
+            deduplicator: Pomijanie duplikatów kart przed GUI (zbiera całą partię przed pierwszą kartą)
+            profiler: Profilowanie najwolniejszych plików pod cProfile na koniec partii
+            file_timeout_s: Limit czasu extract + parse na plik - nadzorowane procesy (zawsze, także przy workers <= 1)
+            worker_memory_mb: Limit pamięci procesu roboczego - jak wyżej
+            quiet_stdout: Komunikaty procesów roboczych na stderr (np. CLI z wynikami na stdout)
+        """
         self.text_extractor = text_extractor
         self.data_parser = data_parser
         self.data_enricher = data_enricher
         self.gui_automator = gui_automator
+        self.workers = workers
+        self.queue_size = queue_size or max(2 * workers, 1)
+        self.streaming = streaming
+        self.cache = cache
+        self.repository = repository
+        self._pending_records: List[Tuple[Path, str, PDFData]] = []
+        self._journal: Optional[ProcessingJournal] = None
+        self._fingerprints: Dict[Path, str] = {}
+        self.metrics_dir = metrics_dir
+        self.metrics_hooks = list(metrics_hooks)
+        self.metrics = StageMetrics(self.metrics_hooks)
+        self.deduplicator = deduplicator
+        self.dedup_report: Optional[DedupReport] = None
+        self.profiler = profiler
+        self.file_timeout_s = file_timeout_s
+        self.worker_memory_mb = worker_memory_mb
+        self.quiet_stdout = quiet_stdout
+
+    def parse_pdf(self, pdf_path: Path) -> PDFData:
+        """Etapy 1-2 dla jednego pliku (z cache, jeśli ustawiony)"""
+        data, timings = extract_and_parse(self.text_extractor, self.data_parser, pdf_path, self.streaming, self.cache)
+        self._record_timings(pdf_path, timings)
+        return data
+
+    def _record_timings(self, pdf_path: Path, timings: Dict[str, Dict[str, float]]) -> None:
+        for stage, values in timings.items():
+            self.metrics.record(pdf_path.name, stage, values)
+        if self.profiler is not None:
+            self.profiler.observe(pdf_path, timings)
+
+    def _finish_metrics(self) -> None:
+        """Koniec partii: metryki etapów i (opcjonalnie) profile najwolniejszych plików"""
+        self.metrics.finish(self.metrics_dir)
+        if self.profiler is not None:
+            self.profiler.finish(self.text_extractor, self.data_parser, self.streaming)
 
     def process_pdf(self, pdf_path: Path, prepared_by: str) -> bool:
         """
@@ -124,86 +528,642 @@ class PDFtoGUIService:
             bool: True jeśli sukces
         """
         try:
-            print(f"\n{'=' * 70}")
-            print(f"Przetwarzanie: {pdf_path.name}")
-            print(f"{'=' * 70}")
+            self._print_header(pdf_path)
 
-            # 1. Ekstrakcja tekstu
-            text = self.text_extractor.extract_text(pdf_path)
+            # 1-2. Ekstrakcja tekstu i parsowanie danych
+            data = self.parse_pdf(pdf_path)
             print("  ✓ Wyekstrahowano tekst")
-
-            # 2. Parsowanie danych
-            data = self.data_parser.parse(text)
-            data.prepared_by = prepared_by
             print("  ✓ Sparsowano dane")
 
-            # 3. Wzbogacenie z Excel
+            ok = self._fill_and_generate(pdf_path, data, prepared_by)
+            self._flush_records()
+            return ok
+
+        except Exception as e:
+            self._print_error(e)
+            return False
+
+    def _enrich(self, pdf_path: Path, data: PDFData, prepared_by: str) -> PDFData:
+        """Etap 3: Excel + zapis do bazy (jeśli ustawiona)"""
+        data, timing = self.enrich_data(pdf_path, data, prepared_by)
+        self.metrics.record(pdf_path.name, "enrich", timing)
+        self._store(pdf_path, data)
+        return data
+
+    def enrich_data(self, pdf_path: Path, data: PDFData, prepared_by: str) -> Tuple[PDFData, Dict[str, float]]:
+        """Etap 3 bez metryk i bazy - można go wywołać w wątku roboczym"""
+        data.prepared_by = prepared_by
+        with StageTimer() as timer:
             data = self.data_enricher.enrich(data, pdf_path.stem)
+        return data, timer.as_dict()
 
-            # 4. Wypełnienie formularza GUI
-            self.gui_automator.fill_form(data)
+    def _iter_enriched(self, items, prepared_by: str) -> Iterator[Tuple]:
+        """
+        Etap 3 dla strumienia wyników (plik, dane, błąd, pomiary): partie po ENRICH_BATCH kart
+        idą do enrich_many (jedno złączenie na partię, nie na całą listę plików), używane są
+        zwrócone przez niego dane, a pomiar "enrich" partii jest dzielony równo między jej karty.
+        Błąd partii → wzbogacenie karta po karcie, żeby jedna zła karta nie psuła pozostałych.
+        """
+        chunk = []
+        for item in items:
+            chunk.append(item)
+            if len(chunk) >= self.ENRICH_BATCH:
+                yield from self._enrich_chunk(chunk, prepared_by)
+                chunk = []
+        yield from self._enrich_chunk(chunk, prepared_by)
 
-            # 5. Generowanie PDF
-            self.gui_automator.generate_pdf()
+    def _enrich_chunk(self, chunk: List[Tuple], prepared_by: str) -> Iterator[Tuple]:
+        cards = [item for item in chunk if item[2] is None]
+        if cards:
+            for _, data, _, _ in cards:
+                data.prepared_by = prepared_by
+            try:
+                with StageTimer() as timer:
+                    enriched = self.data_enricher.enrich_many([data for _, data, _, _ in cards],
+                                                              [pdf_file.stem for pdf_file, _, _, _ in cards])
+                if len(enriched) != len(cards):
+                    raise ValueError(f"enrich_many zwrócił {len(enriched)} kart zamiast {len(cards)}")
+            except Exception:
+                for pdf_file, data, error, timings in chunk:
+                    if error is None:
+                        try:
+                            data, timings["enrich"] = self.enrich_data(pdf_file, data, prepared_by)
+                        except Exception as e:
+                            data, error = None, e
+                    yield pdf_file, data, error, timings
+                return
+
+            share = {name: value / len(cards) for name, value in timer.as_dict().items()}
+            results = iter(enriched)
+            for pdf_file, data, error, timings in chunk:
+                if error is None:
+                    data = next(results)
+                    timings["enrich"] = dict(share)
+                yield pdf_file, data, error, timings
+            return
+        yield from chunk
+
+    def _store(self, pdf_path: Path, data: PDFData) -> None:
+        if self.repository is not None:
+            self._pending_records.append((pdf_path, file_fingerprint(pdf_path), data))
+            if len(self._pending_records) >= self.repository.batch_size:
+                self._flush_records()
+
+    def _flush_records(self) -> None:
+        if self.repository is not None and self._pending_records:
+            saved = self.repository.save_many(self._pending_records)
+            print(f"  💾 Zapisano w bazie: {saved} nowych/zmienionych rekordów")
+            self._pending_records = []
+
+    def _fill_and_generate(self, pdf_path: Path, data: PDFData, prepared_by: str, enriched: bool = False) -> bool:
+        """
+        Etapy 3-5: Excel → formularz GUI → generowanie PDF
+
+        Args:
+            enriched: Dane już wzbogacone (enrich_data w wątku roboczym) - zostaje tylko zapis do bazy
+        """
+        try:
+            # 3. Wzbogacenie z Excel
+            if enriched:
+                self._store(pdf_path, data)
+            else:
+                data = self._enrich(pdf_path, data, prepared_by)
+
+            # 4-5. Formularz GUI i generowanie PDF
+            self._generate_card(pdf_path, data)
 
             print(f"{'=' * 70}\n")
             return True
 
+        except GUIStateLost:
+            raise  # przerywa całą partię, nie tylko kartę
         except Exception as e:
-            print(f"  ✗ BŁĄD: {e}")
-            import traceback
-            traceback.print_exc()
+            self._print_error(e)
             return False
 
-    def process_directory(self, directory: Path, prepared_by: str) -> Dict[str, int]:
-        """Przetwarza wszystkie PDF-y z katalogu"""
-        pdf_files = list(directory.glob("*.pdf"))
+    def _generate_card(self, pdf_path: Path, data: PDFData) -> Dict[str, Dict[str, float]]:
+        """Etapy 4-5: wypełnienie formularza i generowanie PDF; zwraca pomiary obu etapów"""
+        timings = {}
+
+        # 4. Wypełnienie formularza GUI
+        with StageTimer() as timer:
+            self.gui_automator.fill_form(data)
+        timings["fill"] = timer.as_dict()
+        self.metrics.record(pdf_path.name, "fill", timings["fill"])
+        self._journal_record(pdf_path, "filled")
+
+        # 5. Generowanie PDF
+        with StageTimer() as timer:
+            self.gui_automator.generate_pdf()
+        timings["generate"] = timer.as_dict()
+        self.metrics.record(pdf_path.name, "generate", timings["generate"])
+        self._journal_record(pdf_path, "generated")
+        return timings
+
+    def iter_process(self, directory: Path, prepared_by: str = "", include: Iterable[str] = DEFAULT_INCLUDE,
+                     exclude: Iterable[str] = (), recursive: bool = True) -> Iterator[PDFResult]:
+        """
+        Strumieniowe przetwarzanie drzewa katalogów: PDFResult dla każdego pliku zaraz po jego zakończeniu.
+
+        Pliki są wyszukiwane leniwie (iter_pdf_files), a etapy 1-2 idą przez ograniczoną kolejkę
+        _iter_parsed - pamięć nie rośnie z liczbą plików. Bez gui_automator (None) wyniki
+        kończą się na Excelu i zapisie do bazy.
+
+        Użycie:
+            for result in service.iter_process(Path("archiwum"), exclude=["*_old*"]):
+                print(result.path, result.ok)
+        """
+        self.metrics = StageMetrics(self.metrics_hooks)
+        pdf_files = iter_pdf_files(directory, include, exclude, recursive)
+        try:
+            for pdf_file, data, error, timings in self.iter_prepared(pdf_files, prepared_by):
+                self._record_timings(pdf_file, timings)
+                if error is None:
+                    try:
+                        self._store(pdf_file, data)
+                        if self.gui_automator is not None:
+                            timings.update(self._generate_card(pdf_file, data))
+                    except GUIStateLost as e:
+                        # Stan okien nieznany - dalsze karty nie są wysyłane do GUI
+                        yield PDFResult(pdf_file, data, e, timings)
+                        return
+                    except Exception as e:
+                        error = e
+                yield PDFResult(pdf_file, data, error, timings)
+        finally:
+            self._flush_records()
+            self._finish_metrics()
+
+    def process_directory(self, directory: Path, prepared_by: str, resume: bool = False) -> Dict[str, int]:
+        """
+        Przetwarza wszystkie PDF-y z katalogu
+
+        Args:
+            resume: Prowadź dziennik postępu w katalogu i pomiń pliki już wygenerowane
+                    (wznowienie po awarii GUI)
+        """
+        pdf_files, stats = self.start_batch(directory, resume, prepared_by)
+        if not pdf_files and not stats['skipped']:
+            return stats
+
+        try:
+            for pdf_file, data, error, timings in self.iter_prepared(pdf_files, prepared_by, stats):
+                self.handle_card(pdf_file, data, error, timings, prepared_by, stats, enriched=True)
+        except GUIStateLost as e:
+            stats['failed'] += 1
+            self._print_error(e)
+            print("⏹ Partia przerwana - sprawdź okno programu; wznowienie pominie karty już wygenerowane")
+        finally:
+            self.finish_batch()
+
+        return stats
+
+    def start_batch(self, directory: Path, resume: bool = False,
+                    prepared_by: str = "") -> Tuple[List[Path], Dict[str, int]]:
+        """
+        Początek partii: lista plików do przetworzenia, statystyki, metryki i dziennik wznowienia.
+        Wznowienie pomija tylko pliki wygenerowane z tymi samymi ustawieniami (_journal_context).
+        """
+        pdf_files = sorted(directory.glob("*.pdf"))
+        stats = {'success': 0, 'failed': 0, 'skipped': 0, 'duplicates': 0}
 
         if not pdf_files:
             print(f"⚠ Nie znaleziono plików PDF w: {directory}")
-            return {'success': 0, 'failed': 0}
+            return [], stats
 
         print(f"\n📄 Znaleziono {len(pdf_files)} plików PDF\n")
 
-        stats = {'success': 0, 'failed': 0}
+        self.metrics = StageMetrics(self.metrics_hooks)
+        # Formularz mógł być edytowany ręcznie między partiami
+        if self.gui_automator is not None:
+            self.gui_automator.reset_form()
+
+        if resume:
+            self._journal = ProcessingJournal(directory / JOURNAL_NAME, self._journal_context(prepared_by))
+            pdf_files = self._skip_completed(pdf_files, stats)
+        return pdf_files, stats
+
+    def handle_card(self, pdf_file: Path, data: Optional[PDFData], error: Optional[Exception],
+                    timings: Dict, prepared_by: str, stats: Dict[str, int], enriched: bool = False) -> bool:
+        """Etapy 3-5 dla jednego wyniku _iter_parsed (w wątku GUI)"""
+        self._record_timings(pdf_file, timings)
+        self._print_header(pdf_file)
+        if error is not None:
+            # Błąd jednego pliku nie zatrzymuje pozostałych
+            self._print_error(error)
+            stats['failed'] += 1
+            return False
+
+        self._journal_record(pdf_file, "extracted")
+        self._journal_record(pdf_file, "parsed")
+        print("  ✓ Wyekstrahowano tekst")
+        print("  ✓ Sparsowano dane")
+        if self._fill_and_generate(pdf_file, data, prepared_by, enriched):
+            stats['success'] += 1
+            return True
+        stats['failed'] += 1
+        return False
+
+    def finish_batch(self) -> None:
+        """Koniec partii: zamknięcie dziennika, zapis zaległych rekordów do bazy i metryk"""
+        if self.gui_automator is not None:
+            self.gui_automator.close()
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+            self._fingerprints = {}
 
+        print("\n⏳ Finalizacja...")
+        self._flush_records()
+        self._finish_metrics()
 
+    def _skip_completed(self, pdf_files: List[Path], stats: Dict[str, int]) -> List[Path]:
+        """
+        Odrzuca pliki oznaczone w dzienniku jako wygenerowane (z niezmienioną treścią)
+        oraz duplikaty odrzucone w poprzednim przebiegu - ich bliźniak też jest już pomijany,
+        więc deduplikacja nie miałaby ich z czym porównać.
+        """
+        remaining = []
+        duplicates = 0
         for pdf_file in pdf_files:
-            if self.process_pdf(pdf_file, prepared_by):
-                stats['success'] += 1
+            fingerprint = file_fingerprint(pdf_file)
+            state = self._journal.state(pdf_file, fingerprint)
+            if state == "duplicate":
+                duplicates += 1
+            elif state == "generated":
+                stats['skipped'] += 1
             else:
-                stats['failed'] += 1
+                self._fingerprints[pdf_file] = fingerprint
+                remaining.append(pdf_file)
 
-        print("\n⏳ Finalizacja...")
+        stats['duplicates'] += duplicates
+        if duplicates:
+            print(f"⏭ Wznowienie: pominięto {duplicates} duplikatów odrzuconych w poprzednim przebiegu")
+        if stats['skipped']:
+            print(f"⏭ Wznowienie: pominięto {stats['skipped']} z {len(pdf_files)} plików już wygenerowanych")
+            if remaining:
+                print(f"  Start od: {remaining[0].name}\n")
+        return remaining
+
+    def _journal_context(self, prepared_by: str) -> str:
+        """Skrót ustawień, od których zależy wygenerowana karta: folder wyników, prepared_by, arkusz Excel"""
+        output_dir = getattr(self.gui_automator, "output_dir", None)
+        excel_path = getattr(self.data_enricher, "excel_path", None)
+        excel = ""
+        if excel_path is not None and Path(excel_path).exists():
+            excel = f"{Path(excel_path).resolve()}:{file_fingerprint(Path(excel_path))}"
+        context = json.dumps({
+            "output_dir": str(Path(output_dir).resolve()) if output_dir else "",
+            "prepared_by": prepared_by,
+            "excel": excel,
+        }, sort_keys=True)
+        return hashlib.sha256(context.encode("utf-8")).hexdigest()[:16]
 
+    def _journal_record(self, pdf_path: Path, state: str) -> None:
+        if self._journal is not None:
+            self._journal.record(pdf_path, self._fingerprints[pdf_path], state)
+
+    def import_directory(self, directory: Path, prepared_by: str) -> Dict[str, int]:
+        """Import bez GUI: PDF → dane → baza SQLite (wymaga repository)"""
+        if self.repository is None:
+            raise ValueError("import_directory wymaga ustawionego repository")
+
+        stats = {'success': 0, 'failed': 0}
+        self.metrics = StageMetrics(self.metrics_hooks)
+        parsed = self._iter_parsed(sorted(directory.glob("*.pdf")))
+        for pdf_file, data, error, timings in self._iter_enriched(parsed, prepared_by):
+            self._record_timings(pdf_file, timings)
+            try:
+                if error is not None:
+                    raise error
+                self._store(pdf_file, data)
+                stats['success'] += 1
+            except Exception as e:
+                print(f"  ✗ {pdf_file.name}: {e}")
+                stats['failed'] += 1
 
+        self._flush_records()
+        self._finish_metrics()
         return stats
 
+    def _iter_parsed(self, pdf_files) -> Iterator[Tuple[Path, Optional[PDFData], Optional[Exception], Dict]]:
+        """
+        Etapy 1-2 dla listy plików → (plik, dane, błąd, pomiary) w kolejności plików.
+
+        Przy workers > 1 producent/konsument: pula procesów robi ekstrakcję + parsowanie
+        z wyprzedzeniem, a konsument bierze wyniki z ograniczonej kolejki.
+        Z limitem czasu lub pamięci na plik pula jest nadzorowana (SupervisedExecutor):
+        zawieszony lub zbyt pamięciożerny plik kończy się błędem, a proces jest wymieniany.
+        """
+        supervised = self.file_timeout_s is not None or self.worker_memory_mb is not None
+        if self.workers <= 1 and not supervised:
+            for pdf_file in pdf_files:
+                try:
+                    data, timings = extract_and_parse(
+                        self.text_extractor, self.data_parser, pdf_file, self.streaming, self.cache
+                    )
+                    yield pdf_file, data, None, timings
+                except Exception as e:
+                    yield pdf_file, None, e, {}
+            return
+
+        # Importy leniwe - tylko w trybie równoległym/nadzorowanym
+        from concurrent.futures.process import BrokenProcessPool
+
+        # Przekierowanie w rodzicu (redirect_stdout) nie obejmuje procesów spawn/forkserver
+        initializer = stdout_to_stderr if self.quiet_stdout else None
+
+        def new_pool():
+            if supervised:
+                from supervisedWorker import SupervisedExecutor
+                return SupervisedExecutor(self.workers, self.file_timeout_s, self.worker_memory_mb, initializer)
+            from concurrent.futures import ProcessPoolExecutor
+            return ProcessPoolExecutor(max_workers=self.workers, initializer=initializer)
+
+        files = iter(pdf_files)
+        pending = deque()
+        pool = new_pool()
+
+        def rebuild(broken) -> None:
+            """Proces puli zginął (np. segfault) - pliki w toku kończą się BrokenProcessPool, reszta idzie do nowej puli"""
+            nonlocal pool
+            if pool is broken:
+                print("  ⚠ Proces puli zakończył się nieoczekiwanie - nowa pula procesów")
+                broken.shutdown(wait=False, cancel_futures=True)
+                pool = new_pool()
+
+        def submit_next() -> None:
+            pdf_file = next(files, None)
+            if pdf_file is None:
+                return
+            args = (extract_and_parse, self.text_extractor, self.data_parser, pdf_file, self.streaming, self.cache)
+            try:
+                future = pool.submit(*args)
+            except BrokenProcessPool:
+                rebuild(pool)
+                future = pool.submit(*args)
+            pending.append((pdf_file, future, pool))
+
+        try:
+            # Kolejka ograniczona: najwyżej queue_size plików czeka na GUI
+            for _ in range(self.queue_size):
+                submit_next()
+
+            done = 0
+            while pending:
+                pdf_file, future, owner = pending.popleft()
+                submit_next()
+
+                # Kopie cache w procesach nie pilnują limitu - robi to nadzorca
+                done += 1
+                if self.cache is not None and done % self.cache.TRIM_EVERY == 0:
+                    self.cache.trim()
+
+                try:
+                    data, timings = future.result()
+                    yield pdf_file, data, None, timings
+                except BrokenProcessPool as e:
+                    rebuild(owner)
+                    yield pdf_file, None, e, {}
+                except Exception as e:
+                    yield pdf_file, None, e, {}
+        finally:
+            pool.shutdown()
+            if self.cache is not None:
+                self.cache.trim()
+
+    def iter_prepared(self, pdf_files, prepared_by: str,
+                      stats: Optional[Dict[str, int]] = None) -> Iterator[Tuple[Path, Optional[PDFData], Optional[Exception], Dict]]:
+        """
+        Etapy 1-3 bez GUI (ekstrakcja, parsowanie, deduplikacja, Excel) → jak _iter_parsed, z pomiarem "enrich".
+        Nie dotyka metryk, dziennika ani bazy - przeznaczone dla wątku roboczego,
+        wyniki trafiają do handle_card(..., enriched=True) w wątku GUI.
+        Excel: jedno złączenie (enrich_many) na każde ENRICH_BATCH kart, nie wyszukiwanie karta po karcie.
+        """
+        yield from self._iter_enriched(self._deduplicated(self._iter_parsed(pdf_files), stats), prepared_by)
+
+    def _deduplicated(self, parsed, stats: Optional[Dict[str, int]] = None):
+        """
+        Deduplikacja między parsowaniem a GUI: zbiera wyniki partii i przepuszcza tylko karty
+        wybrane przez deduplicator (błędy przechodzą bez zmian). Bez deduplicator - bez buforowania.
+        Z deduplicator cała partia jest parsowana i trzymana w pamięci przed pierwszą kartą w GUI
+        (bez nakładania ekstrakcji z GUI) - dlatego deduplikacja jest domyślnie wyłączona.
+        """
+        if self.deduplicator is None:
+            yield from parsed
+            return
+
+        items = list(parsed)
+        report = self.deduplicator.select(
+            [(pdf_file, data) for pdf_file, data, error, _ in items if error is None], self._fingerprints
+        )
+        self.dedup_report = report
+        report.print_summary()
+        if stats is not None:
+            stats['duplicates'] = stats.get('duplicates', 0) + len(report.dropped)
+        if report.dropped and self.metrics_dir is not None:
+            Path(self.metrics_dir).mkdir(parents=True, exist_ok=True)
+            report.export_csv(Path(self.metrics_dir) / f"duplicates_{time.strftime('%Y%m%d_%H%M%S')}.csv")
+
+        for card in report.dropped:
+            self._journal_record(card.path, "duplicate")
+
+        kept = set(report.kept)
+        for item in items:
+            if item[2] is not None or item[0] in kept:
+                yield item
+
+    @staticmethod
+    def _print_header(pdf_path: Path) -> None:
+        print(f"\n{'=' * 70}")
+        print(f"Przetwarzanie: {pdf_path.name}")
+        print(f"{'=' * 70}")
+
+    @staticmethod
+    def _print_error(e: Exception) -> None:
+        print(f"  ✗ BŁĄD: {e}")
+        import traceback
+        traceback.print_exception(type(e), e, e.__traceback__)
+
 
 # ============================================================================
 # FACTORY
 # ============================================================================
 
 class PDFtoGUIServiceFactory:
-    """Factory: Tworzenie serwisu z automatyzacją GUI"""
+    """
+    Factory: Tworzenie serwisu z automatyzacją GUI
 
-    @staticmethod
-    def create(main_window, excel_path: Optional[Path] = None) -> PDFtoGUIService:
+    Backendy (ekstraktor, parser, enricher, automator) są zarejestrowane po nazwie jako
+    "moduł:Klasa" i importowane dopiero przy pierwszym użyciu - import model.py nie ładuje
+    pdfplumber, pandas ani pyautogui. Czasy tych importów zwraca import_report().
+    """
+
+    # rodzaj -> nazwa -> (cel "moduł:Klasa", moduły zależności ładowane razem z backendem)
+    BACKENDS: Dict[str, Dict[str, Tuple[str, Tuple[str, ...]]]] = {
+        "extractor": {
+            "pdfplumber": ("model:PDFTextExtractor", ("pdfplumber",)),
+            "content-stream": ("streamExtractor:ContentStreamTextExtractor", ("pdfminer",)),
+            "template": ("layoutTemplates:TemplateTextExtractor", ("pdfplumber",)),
+        },
+        "parser": {
+            "single-pass": ("model:SinglePassDataParser", ()),
+            "regex": ("model:RegexDataParser", ()),
+        },
+        "enricher": {
+            "excel": ("excelExtract:ExcelDataEnricher", ()),
+        },
+        "automator": {
+            "gui": ("guiAutomator:MainWindowGUIAutomator", ("pyautogui",)),
+            "headless": ("guiAutomator:HeadlessGUIAutomator", ()),
+        },
+    }
+
+    # Domyślny limit czasu importów backendów [s] dla check_import_budget
+    IMPORT_BUDGET_S = 0.5
+
+    _loaded: Dict[Tuple[str, str], type] = {}
+    _import_times: Dict[str, float] = {}
+
+    @classmethod
+    def register(cls, kind: str, name: str, target: str, requires: Tuple[str, ...] = ()) -> None:
+        """Rejestruje backend, np. register("parser", "moj", "mojModul:MojParser")"""
+        cls.BACKENDS.setdefault(kind, {})[name] = (target, tuple(requires))
+        cls._loaded.pop((kind, name), None)
+
+    @classmethod
+    def backend(cls, kind: str, name: str) -> type:
+        """Klasa backendu - import przy pierwszym użyciu, później z pamięci"""
+        if (kind, name) in cls._loaded:
+            return cls._loaded[(kind, name)]
+
+        try:
+            target, requires = cls.BACKENDS[kind][name]
+        except KeyError:
+            available = ", ".join(cls.BACKENDS.get(kind, {})) or "-"
+            raise ValueError(f"Nieznany backend {kind}='{name}' (dostępne: {available})") from None
+
+        module_name, class_name = target.split(":")
+        for module in requires + (module_name,):
+            cls._import(module)
+
+        backend_class = getattr(importlib.import_module(module_name), class_name)
+        cls._loaded[(kind, name)] = backend_class
+        return backend_class
+
+    @classmethod
+    def _import(cls, module_name: str) -> None:
+        if module_name in cls._import_times:
+            return
+        started = time.perf_counter()
+        importlib.import_module(module_name)
+        cls._import_times[module_name] = time.perf_counter() - started
+
+    @classmethod
+    def import_report(cls) -> Dict[str, float]:
+        """Czasy importów wykonanych przez rejestr [s], od najdłuższego"""
+        return dict(sorted(cls._import_times.items(), key=lambda item: item[1], reverse=True))
+
+    @classmethod
+    def check_import_budget(cls, budget_s: Optional[float] = None) -> bool:
+        """Wypisuje raport importów; False jeśli ich suma przekracza budżet"""
+        budget_s = cls.IMPORT_BUDGET_S if budget_s is None else budget_s
+        report = cls.import_report()
+        total = sum(report.values())
+        print(f"⏱ Importy backendów: {total * 1000:.0f} ms (budżet {budget_s * 1000:.0f} ms)")
+        for module, seconds in report.items():
+            print(f"  {module:<20} {seconds * 1000:8.1f} ms")
+        return total <= budget_s
+
+    @classmethod
+    def create(
+            cls,
+            main_window,
+            excel_path: Optional[Path] = None,
+            workers: int = 0,
+            streaming: bool = False,
+            max_pages: Optional[int] = None,
+            cache_dir: Optional[Path] = None,
+            output_dir: Optional[Path] = None,
+            headless: bool = False,
+            db_path: Optional[Path] = None,
+            metrics_dir: Optional[Path] = None,
+            extractor: str = "pdfplumber",
+            parser: str = "single-pass",
+            enricher: str = "excel",
+            dedup: Optional[str] = None,
+            low_memory: bool = False,
+            max_rss_mb: Optional[float] = None,
+            profile_dir: Optional[Path] = None,
+            profile_threshold_s: Optional[float] = None,
+            profile_top_n: int = 5,
+            file_timeout_s: Optional[float] = None,
+            worker_memory_mb: Optional[float] = None,
+            quiet_stdout: bool = False
+    ) -> PDFtoGUIService:
         """
         Args:
-            main_window: Instancja MainWindow z Twojego programu
+            main_window: Instancja MainWindow z Twojego programu (None = bez GUI, np. iter_process)
             excel_path: Opcjonalna ścieżka do Excel
+            workers: Liczba procesów do ekstrakcji/parsowania (0 = szeregowo)
+            streaming: Leniwe czytanie stron z wczesnym przerwaniem
+            max_pages: Opcjonalny limit czytanych stron
+            cache_dir: Katalog cache tekstu/PDFData (None = bez cache)
+            output_dir: Folder zapisu generowanych PDF-ów (sygnał zakończenia generowania)
+            headless: Renderuj bez widocznego okna i pyautogui (wymaga output_dir)
+            db_path: Baza SQLite na sparsowane dane (None = bez zapisu)
+            metrics_dir: Folder na metryki etapów po każdej partii (None = bez zapisu)
+            extractor, parser, enricher: Nazwy backendów z BACKENDS
+            low_memory, max_rss_mb: Zwalnianie stron po odczycie i limit pamięci na plik (ekstraktor)
+            profile_dir: Folder na profile cProfile najwolniejszych plików (None = bez profilowania)
+            profile_threshold_s, profile_top_n: Próg czasu extract + parse i liczba zawsze profilowanych plików
+            file_timeout_s, worker_memory_mb: Limity czasu i pamięci na plik w nadzorowanych procesach
+            quiet_stdout: Komunikaty procesów roboczych na stderr
+            dedup: Reguła pomijania duplikatów kart: "mtime" lub "revision" (None = bez deduplikacji)
         """
-        text_extractor = PDFTextExtractor()
-        data_parser = RegexDataParser()
-        data_enricher = ExcelDataEnricher(excel_path)
-        gui_automator = MainWindowGUIAutomator(main_window)
+        memory_options = {}
+        if low_memory:
+            memory_options["low_memory"] = True
+        if max_rss_mb:
+            memory_options["max_rss_mb"] = max_rss_mb
+        if (max_rss_mb or metrics_dir) and not rss_available():
+            print("⚠ Brak psutil - RSS nie jest mierzone: limit pamięci na plik (max_rss_mb) nie działa, "
+                  "a przyrosty RSS w metrykach są zerowe (pip install psutil)")
+        if extractor == "template":
+            # Szablony układów obok reszty danych importu, nie w katalogu domowym
+            if cache_dir is None and db_path is None:
+                raise ValueError("Ekstraktor 'template' wymaga cache_dir lub db_path (tam zapisywane są szablony)")
+            from layoutTemplates import STORE_NAME
+            store_dir = Path(cache_dir) if cache_dir is not None else Path(db_path).parent
+            memory_options["store_path"] = store_dir / STORE_NAME
+        text_extractor = cls.backend("extractor", extractor)(max_pages, **memory_options)
+        data_parser = cls.backend("parser", parser)()
+        data_enricher = cls.backend("enricher", enricher)(excel_path)
+        if main_window is None:
+            gui_automator = None
+        elif headless:
+            if output_dir is None:
+                raise ValueError("Tryb headless wymaga output_dir")
+            gui_automator = cls.backend("automator", "headless")(main_window, output_dir)
+        else:
+            gui_automator = cls.backend("automator", "gui")(main_window, output_dir)
 
         return PDFtoGUIService(
             text_extractor=text_extractor,
             data_parser=data_parser,
             data_enricher=data_enricher,
-            gui_automator=gui_automator
+            gui_automator=gui_automator,
+            workers=workers,
+            streaming=streaming,
+            cache=PDFCache(cache_dir) if cache_dir else None,
+            repository=PDFDataRepository(db_path) if db_path else None,
+            metrics_dir=metrics_dir,
+            deduplicator=CardDeduplicator(dedup) if dedup else None,
+            profiler=SlowFileProfiler(
+                profile_dir, profile_threshold_s, profile_top_n,
+                timeout_s=file_timeout_s, max_memory_mb=worker_memory_mb
+            ) if profile_dir else None,
+            file_timeout_s=file_timeout_s,
+            worker_memory_mb=worker_memory_mb,
+            quiet_stdout=quiet_stdout
         )
-
-
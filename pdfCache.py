@@ -0,0 +1,146 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Optional, Tuple
+
+from tempDataBase import PDFData
+
+
+def file_fingerprint(file_path: Path, chunk_size: int = 1 << 20) -> str:
+    """SHA-256 zawartości pliku"""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class PDFCache:
+    """
+    Cache na dysku: wyekstrahowany tekst + sparsowane PDFData.
+    Klucz = hash treści pliku + wersja ekstraktora/parsera, usuwanie LRU po przekroczeniu limitu.
+
+    Limit pilnuje tylko proces, który utworzył cache: kopie przekazane do procesów roboczych
+    (pickle) tylko zapisują wpisy, a nadzorca co TRIM_EVERY plików woła trim().
+    Zapis wpisu jest "best effort" - błąd dysku nie psuje przetwarzania pliku.
+    """
+
+    # Co ile plików przetworzonych w procesach roboczych nadzorca sprawdza limit rozmiaru
+    TRIM_EVERY = 256
+
+    def __init__(self, cache_dir: Path, max_size_mb: float = 256):
+        """
+        Args:
+            cache_dir: Katalog na wpisy cache (tworzony automatycznie)
+            max_size_mb: Limit rozmiaru cache w MB
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_size = int(max_size_mb * 1024 * 1024)
+        self._size = None  # szacowany rozmiar, liczony leniwie
+        self._owner = True  # False w kopii procesu roboczego - bez liczenia rozmiaru i usuwania
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_size"] = None
+        state["_owner"] = False
+        return state
+
+    @classmethod
+    def make_key(cls, pdf_path: Path, text_extractor, data_parser, streaming: bool = False) -> str:
+        """
+        Klucz wpisu: hash pliku + hash konfiguracji (nazwa, wersja i opcje ekstraktora oraz parsera,
+        tryb streaming) - tekst ucięty przez max_pages albo wczesne przerwanie nie trafi do pełnej ekstrakcji.
+        """
+        config = "|".join((cls.component_key(text_extractor), cls.component_key(data_parser), f"streaming={streaming}"))
+        return f"{file_fingerprint(pdf_path)}-{hashlib.sha256(config.encode('utf-8')).hexdigest()[:16]}"
+
+    @classmethod
+    def component_key(cls, component) -> str:
+        """Nazwa i VERSION komponentu oraz wartości atrybutów z CACHE_OPTIONS (zagnieżdżone komponenty rekurencyjnie)"""
+        parts = [f"{type(component).__name__}{getattr(component, 'VERSION', '1')}"]
+        for name in getattr(component, "CACHE_OPTIONS", ()):
+            value = getattr(component, name, None)
+            if hasattr(value, "CACHE_OPTIONS") or hasattr(value, "VERSION"):
+                value = f"({cls.component_key(value)})"
+            parts.append(f"{name}={value}")
+        return ",".join(parts)
+
+    def get(self, key: str) -> Optional[Tuple[str, PDFData]]:
+        entry = self.cache_dir / f"{key}.json"
+        try:
+            with open(entry, encoding="utf-8") as f:
+                payload = json.load(f)
+            os.utime(entry)  # LRU: ostatnie użycie = mtime
+        except (OSError, ValueError):
+            return None
+        return payload["text"], PDFData.from_dict(payload["data"])
+
+    def put(self, key: str, text: str, data: PDFData) -> None:
+        entry = self.cache_dir / f"{key}.json"
+        tmp = entry.with_name(f"{entry.name}.{os.getpid()}.tmp")
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"text": text, "data": data.to_dict()}, f, ensure_ascii=False)
+            os.replace(tmp, entry)
+        except OSError as e:
+            print(f"  ⚠ Nie zapisano wpisu cache ({e})")
+            try:
+                tmp.unlink(missing_ok=True)
+            except OSError:
+                pass
+            return
+        if not self._owner:
+            return
+
+        try:
+            if self._size is None:
+                self._size = self._total_size()
+            else:
+                self._size += entry.stat().st_size
+            if self._size > self.max_size:
+                self._evict()
+        except OSError as e:
+            print(f"  ⚠ Nie udało się ograniczyć rozmiaru cache ({e})")
+            self._size = None
+
+    def trim(self) -> None:
+        """Usuwa najdawniej używane wpisy ponad limit (po plikach zapisanych przez procesy robocze)"""
+        try:
+            self._evict()
+        except OSError as e:
+            print(f"  ⚠ Nie udało się ograniczyć rozmiaru cache ({e})")
+
+    def clear(self) -> None:
+        for entry in self.cache_dir.glob("*.json"):
+            entry.unlink(missing_ok=True)
+        self._size = 0
+
+    def _total_size(self) -> int:
+        total = 0
+        for entry in self.cache_dir.glob("*.json"):
+            try:
+                total += entry.stat().st_size
+            except FileNotFoundError:
+                continue  # usunięty równolegle przez inny proces
+        return total
+
+    def _evict(self) -> None:
+        """Usuwa najdawniej używane wpisy, aż cache zmieści się w limicie"""
+        entries = []
+        for entry in self.cache_dir.glob("*.json"):
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue  # usunięty równolegle przez inny proces
+            entries.append((stat.st_mtime, stat.st_size, entry))
+
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry in entries:
+            if total <= self.max_size:
+                break
+            entry.unlink(missing_ok=True)
+            total -= size
+        self._size = total
@@ -0,0 +1,168 @@
+import csv
+import math
+import sys
+from array import array
+from dataclasses import fields
+from pathlib import Path
+from typing import Dict, List, Iterable, Iterator, Optional, Union
+
+from tempDataBase import PDFData
+
+
+NUMERIC_FIELDS = ("gramatura", "otr", "wvtr", "thickness")
+# thickness1/thickness2 dopisuje parser - przechowujemy je razem z polami DTO
+TEXT_FIELDS = tuple(
+    f.name for f in fields(PDFData) if f.name not in NUMERIC_FIELDS
+) + ("thickness1", "thickness2")
+ALL_FIELDS = tuple(f.name for f in fields(PDFData)) + ("thickness1", "thickness2")
+
+
+def _to_float(value) -> float:
+    """Wartość liczbowa z parsera (float/None/tekst) → float, brak = NaN"""
+    if value is None or value == "":
+        return math.nan
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return float(str(value).replace(",", "."))
+    except ValueError:
+        return math.nan
+
+
+def _from_float(value: float) -> Optional[float]:
+    return None if math.isnan(value) else value
+
+
+def _to_text(value) -> str:
+    """Tekst internowany - powtarzające się wartości (opisy, rdzenie, nawoje) współdzielą jeden obiekt"""
+    return sys.intern("" if value is None else str(value))
+
+
+class PDFRecord:
+    """
+    Zwarta wersja PDFData: __slots__ zamiast __dict__, pola liczbowe jako float/None.
+    """
+
+    __slots__ = ALL_FIELDS
+
+    def __init__(self, **values):
+        for name in TEXT_FIELDS:
+            setattr(self, name, _to_text(values.get(name)))
+        for name in NUMERIC_FIELDS:
+            setattr(self, name, _from_float(_to_float(values.get(name))))
+
+    @classmethod
+    def from_pdf_data(cls, data: PDFData) -> "PDFRecord":
+        return cls(**data.to_dict())
+
+    def to_pdf_data(self) -> PDFData:
+        return PDFData.from_dict(self.to_dict())
+
+    def to_dict(self) -> Dict[str, object]:
+        return {name: getattr(self, name) for name in ALL_FIELDS}
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, PDFRecord) and self.to_dict() == other.to_dict()
+
+    def __repr__(self) -> str:
+        return f"PDFRecord(card_no={self.card_no!r}, article_index={self.article_index!r})"
+
+
+class PDFDataBatch:
+    """
+    Kolumnowy kontener wielu kart (np. archiwum z całego roku do raportów).
+
+    Pola liczbowe (gramatura/otr/wvtr/thickness) trzymane są w array('d') - 8 bajtów na wartość,
+    brak wartości = NaN. Pola tekstowe to listy internowanych napisów.
+    Konwersja do/z PDFData działa wiersz po wierszu, eksport do CSV i Parquet.
+    """
+
+    def __init__(self):
+        self._text: Dict[str, List[str]] = {name: [] for name in TEXT_FIELDS}
+        self._numeric: Dict[str, array] = {name: array("d") for name in NUMERIC_FIELDS}
+        self._size = 0
+
+    @classmethod
+    def from_pdf_data(cls, items: Iterable[Union[PDFData, PDFRecord]]) -> "PDFDataBatch":
+        batch = cls()
+        batch.extend(items)
+        return batch
+
+    def __len__(self) -> int:
+        return self._size
+
+    def append(self, item: Union[PDFData, PDFRecord]) -> None:
+        """Dodaje wiersz w całości albo wcale - kolumny zawsze mają tę samą długość"""
+        values = item.to_dict()
+        text = [_to_text(values.get(name)) for name in TEXT_FIELDS]
+        numbers = [_to_float(values.get(name)) for name in NUMERIC_FIELDS]
+
+        # array('d') może odmówić zmiany rozmiaru (BufferError, gdy ktoś trzyma jej bufor) -
+        # kolumny liczbowe najpierw, z wycofaniem już dopisanych wartości
+        appended = []
+        try:
+            for name, value in zip(NUMERIC_FIELDS, numbers):
+                self._numeric[name].append(value)
+                appended.append(name)
+        except BaseException:
+            for name in appended:
+                self._numeric[name].pop()
+            raise
+
+        for name, value in zip(TEXT_FIELDS, text):
+            self._text[name].append(value)
+        self._size += 1
+
+    def extend(self, items: Iterable[Union[PDFData, PDFRecord]]) -> None:
+        for item in items:
+            self.append(item)
+
+    def row(self, index: int) -> Dict[str, object]:
+        values: Dict[str, object] = {name: self._text[name][index] for name in TEXT_FIELDS}
+        for name in NUMERIC_FIELDS:
+            values[name] = _from_float(self._numeric[name][index])
+        return values
+
+    def record(self, index: int) -> PDFRecord:
+        return PDFRecord(**self.row(index))
+
+    def to_pdf_data(self, index: int) -> PDFData:
+        return PDFData.from_dict(self.row(index))
+
+    def __iter__(self) -> Iterator[PDFData]:
+        for index in range(self._size):
+            yield self.to_pdf_data(index)
+
+    def column(self, name: str):
+        """
+        Kolumna po nazwie pola (kopia): lista napisów albo array('d').
+        Jeśli dostępny jest NumPy, kolumny liczbowe zwracane są jako np.ndarray.
+        Widok bez kopiowania blokowałby array('d') przed dopisywaniem kolejnych wierszy.
+        """
+        if name in self._text:
+            return list(self._text[name])
+        if name not in self._numeric:
+            raise KeyError(name)
+        try:
+            import numpy as np
+        except ImportError:
+            return array("d", self._numeric[name])
+        return np.array(self._numeric[name], dtype=np.float64, copy=True)
+
+    def to_dataframe(self):
+        """pandas.DataFrame z kolumnami w kolejności pól PDFData"""
+        import pandas as pd
+        return pd.DataFrame({name: self.column(name) for name in ALL_FIELDS}, columns=list(ALL_FIELDS))
+
+    def export_csv(self, path: Path) -> None:
+        """CSV (bez zależności zewnętrznych); brak wartości liczbowej = puste pole"""
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(ALL_FIELDS)
+            for index in range(self._size):
+                row = self.row(index)
+                writer.writerow(["" if row[name] is None else row[name] for name in ALL_FIELDS])
+
+    def export_parquet(self, path: Path) -> None:
+        """Parquet przez pandas (wymaga pyarrow lub fastparquet)"""
+        self.to_dataframe().to_parquet(path, index=False)
@@ -0,0 +1,119 @@
+import hashlib
+import json
+import sqlite3
+from dataclasses import fields
+from pathlib import Path
+from typing import Optional, List, Tuple, Iterable
+
+from tempDataBase import PDFData
+
+
+class PDFDataRepository:
+    """
+    Zapis sparsowanych PDFData w SQLite.
+    Zapis hurtowy (executemany w transakcjach), WAL, indeksy po card_no i article_index.
+    Rekord jest identyfikowany ścieżką pliku - ponowny import nadpisuje tylko wiersze, w których
+    zmienił się plik albo dane (np. Excel, prepared_by, nowa wersja parsera) - porównanie po data_hash.
+    """
+
+    TABLE = "pdf_data"
+    NUMERIC_COLUMNS = ("gramatura", "otr", "wvtr", "thickness")
+    DATA_COLUMNS = tuple(f.name for f in fields(PDFData)) + ("thickness1", "thickness2")
+
+    def __init__(self, db_path: Path, batch_size: int = 500):
+        """
+        Args:
+            db_path: Ścieżka do pliku bazy SQLite
+            batch_size: Liczba rekordów w jednej transakcji
+        """
+        self.db_path = Path(db_path)
+        self.batch_size = batch_size
+        self.connection = sqlite3.connect(str(self.db_path))
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self._create_schema()
+
+    def _create_schema(self) -> None:
+        columns = ",\n".join(
+            f"    {name} {'REAL' if name in self.NUMERIC_COLUMNS else 'TEXT'}" for name in self.DATA_COLUMNS
+        )
+        with self.connection:
+            self.connection.execute(f"""
+                CREATE TABLE IF NOT EXISTS {self.TABLE} (
+                    id INTEGER PRIMARY KEY,
+                    source TEXT NOT NULL UNIQUE,
+                    fingerprint TEXT NOT NULL,
+                    data_hash TEXT,
+                    imported_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                {columns}
+                )
+            """)
+            # Bazy sprzed kolumny data_hash - stare wiersze (NULL) zostaną odświeżone przy następnym imporcie
+            existing = {row[1] for row in self.connection.execute(f"PRAGMA table_info({self.TABLE})")}
+            if "data_hash" not in existing:
+                self.connection.execute(f"ALTER TABLE {self.TABLE} ADD COLUMN data_hash TEXT")
+            self.connection.execute(f"CREATE INDEX IF NOT EXISTS idx_{self.TABLE}_card_no ON {self.TABLE}(card_no)")
+            self.connection.execute(
+                f"CREATE INDEX IF NOT EXISTS idx_{self.TABLE}_article_index ON {self.TABLE}(article_index)"
+            )
+
+    def save_many(self, records: Iterable[Tuple[Path, str, PDFData]]) -> int:
+        """
+        Zapisuje rekordy (ścieżka pliku, fingerprint, dane) partiami po batch_size.
+        Wiersze z tym samym fingerprintem i tymi samymi danymi są pomijane.
+
+        Returns:
+            int: Liczba wstawionych lub zaktualizowanych wierszy
+        """
+        names = ("source", "fingerprint", "data_hash") + self.DATA_COLUMNS
+        updates = ", ".join(f"{name} = excluded.{name}" for name in names[1:])
+        sql = (
+            f"INSERT INTO {self.TABLE} ({', '.join(names)}) VALUES ({', '.join('?' * len(names))}) "
+            f"ON CONFLICT(source) DO UPDATE SET {updates}, imported_at = CURRENT_TIMESTAMP "
+            f"WHERE {self.TABLE}.fingerprint != excluded.fingerprint "
+            f"OR {self.TABLE}.data_hash IS NOT excluded.data_hash"
+        )
+
+        changed_before = self.connection.total_changes
+        batch: List[tuple] = []
+        for source, fingerprint, data in records:
+            row = self._row(data)
+            batch.append((str(Path(source).resolve()), fingerprint, self._hash(row)) + row)
+            if len(batch) >= self.batch_size:
+                self._write(sql, batch)
+                batch = []
+        if batch:
+            self._write(sql, batch)
+        return self.connection.total_changes - changed_before
+
+    def _write(self, sql: str, batch: List[tuple]) -> None:
+        with self.connection:  # jedna transakcja na partię
+            self.connection.executemany(sql, batch)
+
+    def _row(self, data: PDFData) -> tuple:
+        values = data.to_dict()
+        return tuple(values.get(name) for name in self.DATA_COLUMNS)
+
+    @staticmethod
+    def _hash(row: tuple) -> str:
+        return hashlib.sha256(json.dumps(row, default=str, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+    def get_by_card_no(self, card_no: str) -> Optional[PDFData]:
+        """Ostatnio zaimportowana karta o danym numerze (wyszukiwanie po indeksie)"""
+        return self._get_one("card_no", card_no)
+
+    def get_by_article_index(self, article_index: str) -> Optional[PDFData]:
+        return self._get_one("article_index", article_index)
+
+    def _get_one(self, column: str, value: str) -> Optional[PDFData]:
+        row = self.connection.execute(
+            f"SELECT {', '.join(self.DATA_COLUMNS)} FROM {self.TABLE} WHERE {column} = ? "
+            f"ORDER BY imported_at DESC, id DESC LIMIT 1",
+            (value,)
+        ).fetchone()
+        if row is None:
+            return None
+        return PDFData.from_dict(dict(zip(self.DATA_COLUMNS, row)))
+
+    def close(self) -> None:
+        self.connection.close()
@@ -0,0 +1,64 @@
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, Tuple
+
+
+class ProcessingJournal:
+    """
+    Trwały dziennik postępu przetwarzania katalogu (JSON Lines, tylko dopisywanie).
+    Dla każdego pliku zapisuje etap i fingerprint treści - po awarii można wznowić
+    przetwarzanie i pominąć pliki, które zostały już wygenerowane.
+    Wpisy są ważne tylko w tym samym kontekście importu (context - np. folder wyników,
+    prepared_by, arkusz Excel): import z innymi ustawieniami przetwarza pliki od nowa.
+    """
+
+    STATES = ("extracted", "parsed", "filled", "generated", "duplicate")
+    # Etapy końcowe - plik nie wymaga ponownego przetwarzania
+    DONE_STATES = ("generated", "duplicate")
+
+    def __init__(self, journal_path: Path, context: str = ""):
+        self.journal_path = Path(journal_path)
+        self.context = context
+        self._entries: Dict[str, Tuple[str, str]] = {}  # plik -> (fingerprint, etap) w tym kontekście
+        self._load()
+        self._file = open(self.journal_path, "a", encoding="utf-8")
+
+    def _load(self) -> None:
+        if not self.journal_path.exists():
+            return
+        with open(self.journal_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # urwana ostatnia linia po awarii
+                if entry.get("context", "") == self.context:
+                    self._entries[entry["file"]] = (entry["fingerprint"], entry["state"])
+
+    def state(self, pdf_path: Path, fingerprint: str) -> str:
+        """Ostatni zapisany etap pliku ("" jeśli brak wpisu lub plik się zmienił)"""
+        saved = self._entries.get(pdf_path.name)
+        if saved is None or saved[0] != fingerprint:
+            return ""
+        return saved[1]
+
+    def is_done(self, pdf_path: Path, fingerprint: str) -> bool:
+        return self.state(pdf_path, fingerprint) in self.DONE_STATES
+
+    def record(self, pdf_path: Path, fingerprint: str, state: str) -> None:
+        if state not in self.STATES:
+            raise ValueError(f"Nieznany etap: {state}")
+        self._entries[pdf_path.name] = (fingerprint, state)
+        entry = {
+            "file": pdf_path.name, "fingerprint": fingerprint, "state": state, "context": self.context,
+            "time": time.time(),
+        }
+        self._file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self._file.flush()
+        if state in self.DONE_STATES:
+            os.fsync(self._file.fileno())  # ukończony plik musi przetrwać awarię
+
+    def close(self) -> None:
+        self._file.close()
@@ -0,0 +1,162 @@
+import cProfile
+import csv
+import heapq
+import io
+import pstats
+import re
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+
+def profile_to_file(text_extractor, data_parser, pdf_path: Path, streaming: bool, profile_path: Path) -> str:
+    """
+    extract + parse jednego pliku pod cProfile, profil zapisany do profile_path (także po błędzie).
+    Funkcja modułu - może działać w nadzorowanym procesie roboczym; zwraca opis błędu ("" = OK).
+    """
+    from model import extract_and_parse
+
+    profiler = cProfile.Profile()
+    error = ""
+    try:
+        profiler.runcall(extract_and_parse, text_extractor, data_parser, pdf_path, streaming, None)
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    profiler.dump_stats(str(profile_path))
+    return error
+
+
+class SlowFileProfiler:
+    """
+    Wykrywanie wolnych plików i automatyczne profilowanie.
+
+    W trakcie partii zbiera czasy extract + parse każdego pliku (observe). Na koniec partii
+    pliki powyżej progu oraz top-N najwolniejszych są uruchamiane ponownie pod cProfile
+    (bez cache). Wyniki trafiają do output_dir/slow_<data>/: plik .prof i podsumowanie .txt
+    na każdy plik oraz raport slowest_files.csv.
+
+    Z limitami przetwarzania (timeout_s, max_memory_mb) profilowanie działa w nadzorowanym
+    procesie roboczym - plik bliski limitom nie może zawiesić ani wyczerpać pamięci programu.
+    Limit czasu jest mnożony przez PROFILE_SLOWDOWN (cProfile spowalnia kod).
+    """
+
+    STAGES = ("extract", "parse")
+    # Ile funkcji pokazać w podsumowaniu tekstowym profilu
+    REPORT_LINES = 30
+    # Spowolnienie pod cProfile uwzględniane w limicie czasu profilowania
+    PROFILE_SLOWDOWN = 3.0
+
+    def __init__(self, output_dir: Path, threshold_s: Optional[float] = None, top_n: int = 5,
+                 max_profiles: int = 20, timeout_s: Optional[float] = None,
+                 max_memory_mb: Optional[float] = None):
+        """
+        Args:
+            output_dir: Folder na profile i raporty (podfolder na każdą partię)
+            threshold_s: Profiluj każdy plik, którego extract + parse trwa dłużej (None = tylko top-N)
+            top_n: Liczba najwolniejszych plików profilowanych zawsze
+            max_profiles: Górny limit profili na partię
+            timeout_s, max_memory_mb: Limity przetwarzania pliku - profilowanie w nadzorowanym procesie
+        """
+        self.output_dir = Path(output_dir)
+        self.threshold_s = threshold_s
+        self.top_n = top_n
+        self.max_profiles = max_profiles
+        self.timeout_s = timeout_s
+        self.max_memory_mb = max_memory_mb
+        self._top: List[Tuple[float, int, Path, Dict[str, float]]] = []  # kopiec top-N
+        self._over_threshold: Dict[Path, Tuple[float, Dict[str, float]]] = {}
+        self._counter = 0
+
+    def observe(self, pdf_path: Path, timings: Dict[str, Dict[str, float]]) -> None:
+        stages = {stage: timings[stage]["wall_s"] for stage in self.STAGES if stage in timings}
+        if not stages:
+            return
+        total = sum(stages.values())
+        self._counter += 1
+
+        if self.threshold_s is not None and total >= self.threshold_s:
+            self._over_threshold[pdf_path] = (total, stages)
+        if self.top_n > 0:
+            entry = (total, self._counter, pdf_path, stages)
+            if len(self._top) < self.top_n:
+                heapq.heappush(self._top, entry)
+            elif total > self._top[0][0]:
+                heapq.heapreplace(self._top, entry)
+
+    def selected(self) -> List[Tuple[Path, float, Dict[str, float]]]:
+        """Pliki do profilowania, od najwolniejszego"""
+        chosen = dict(self._over_threshold)
+        for total, _, pdf_path, stages in self._top:
+            chosen[pdf_path] = (total, stages)
+        ranked = sorted(chosen.items(), key=lambda item: item[1][0], reverse=True)
+        return [(pdf_path, total, stages) for pdf_path, (total, stages) in ranked[:self.max_profiles]]
+
+    def finish(self, text_extractor, data_parser, streaming: bool = False) -> Optional[Path]:
+        """Koniec partii: profilowanie wybranych plików i raport; zwraca folder raportu"""
+        selected = self.selected()
+        self._top, self._over_threshold, self._counter = [], {}, 0
+        if not selected:
+            return None
+
+        report_dir = self.output_dir / f"slow_{time.strftime('%Y%m%d_%H%M%S')}"
+        report_dir.mkdir(parents=True, exist_ok=True)
+        print(f"\n🐢 Profilowanie {len(selected)} najwolniejszych plików...")
+
+        pool = None
+        if self.timeout_s is not None or self.max_memory_mb is not None:
+            from supervisedWorker import SupervisedExecutor
+            timeout = self.timeout_s * self.PROFILE_SLOWDOWN if self.timeout_s is not None else None
+            pool = SupervisedExecutor(1, timeout, self.max_memory_mb)
+
+        rows = []
+        try:
+            for rank, (pdf_path, total, stages) in enumerate(selected, 1):
+                rows.append(self._profile_one(rank, pdf_path, total, stages, report_dir, pool,
+                                              text_extractor, data_parser, streaming))
+                print(f"  🐢 {total:7.2f} s  {pdf_path.name}")
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+        with open(report_dir / "slowest_files.csv", "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+            writer.writeheader()
+            writer.writerows(rows)
+
+        print(f"📈 Profile wolnych plików zapisane w: {report_dir}")
+        return report_dir
+
+    def _profile_one(self, rank: int, pdf_path: Path, total: float, stages: Dict[str, float], report_dir: Path,
+                     pool, text_extractor, data_parser, streaming: bool) -> Dict:
+        """Profil jednego pliku (w procesie nadzorowanym, jeśli pool) + wiersz raportu"""
+        name = f"{rank:02d}_{re.sub(r'[^0-9A-Za-z_.-]+', '_', pdf_path.stem)}"
+        profile_path = report_dir / f"{name}.prof"
+        args = (text_extractor, data_parser, pdf_path, streaming, profile_path)
+        started = time.perf_counter()
+        try:
+            error = profile_to_file(*args) if pool is None else pool.submit(profile_to_file, *args).result()
+        except Exception as e:
+            # Limit czasu/pamięci nadzorcy - proces zabity, profilu nie ma
+            error = f"{type(e).__name__}: {e}"
+        profiled_s = time.perf_counter() - started
+
+        if profile_path.exists():
+            (report_dir / f"{name}.txt").write_text(self._summary(profile_path), encoding="utf-8")
+        return {
+            "rank": rank,
+            "file": str(pdf_path),
+            "total_s": round(total, 4),
+            "extract_s": round(stages.get("extract", 0.0), 4),
+            "parse_s": round(stages.get("parse", 0.0), 4),
+            "profiled_s": round(profiled_s, 4),
+            "profile": profile_path.name if profile_path.exists() else "",
+            "error": error,
+        }
+
+    def _summary(self, profile_path: Path) -> str:
+        """Najdroższe funkcje (czas łączny i własny) - do szybkiego przejrzenia bez snakeviz"""
+        buffer = io.StringIO()
+        stats = pstats.Stats(str(profile_path), stream=buffer)
+        stats.sort_stats("cumulative").print_stats(self.REPORT_LINES)
+        stats.sort_stats("tottime").print_stats(self.REPORT_LINES)
+        return buffer.getvalue()
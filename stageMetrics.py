@@ -0,0 +1,182 @@
+import csv
+import json
+import math
+import os
+import random
+import time
+from pathlib import Path
+from typing import Dict, List, Iterable, Optional
+
+from interface import IMetricsHook
+
+
+def current_rss() -> int:
+    """Bieżące RSS procesu w bajtach (psutil → /proc → 0, gdy nie da się zmierzyć - patrz rss_available)"""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        pass
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return 0
+
+
+def rss_available() -> bool:
+    """Czy current_rss mierzy naprawdę: psutil albo /proc (Linux). Na Windows bez psutil - nie."""
+    try:
+        import psutil  # noqa: F401
+        return True
+    except ImportError:
+        return os.path.exists("/proc/self/statm")
+
+
+class StageTimer:
+    """
+    Pomiar etapu: czas zegarowy, czas CPU i zmiana RSS.
+    Można go używać wielokrotnie (with) - wartości się sumują.
+    """
+
+    def __init__(self):
+        self.wall_s = 0.0
+        self.cpu_s = 0.0
+        self.rss_delta = 0
+
+    def __enter__(self) -> "StageTimer":
+        self._wall = time.perf_counter()
+        self._cpu = time.process_time()
+        self._rss = current_rss()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.wall_s += time.perf_counter() - self._wall
+        self.cpu_s += time.process_time() - self._cpu
+        self.rss_delta += current_rss() - self._rss
+
+    def as_dict(self) -> Dict[str, float]:
+        return {"wall_s": self.wall_s, "cpu_s": self.cpu_s, "rss_delta": self.rss_delta}
+
+
+class Histogram:
+    """Histogram czasów w koszykach logarytmicznych (1 ms · 2^k) + min/max/suma"""
+
+    BASE_S = 0.001
+    BUCKETS = 20  # do ~9 min, ostatni koszyk zbiera resztę
+
+    def __init__(self):
+        self.counts = [0] * self.BUCKETS
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    def add(self, value: float) -> None:
+        bucket = 0 if value <= self.BASE_S else int(math.log2(value / self.BASE_S)) + 1
+        self.counts[min(bucket, self.BUCKETS - 1)] += 1
+        self.count += 1
+        self.total += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> float:
+        """Górna granica koszyka, w którym wypada kwantyl q"""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for bucket, count in enumerate(self.counts):
+            seen += count
+            if seen >= target:
+                return min(self.BASE_S * 2 ** bucket, self.max)
+        return self.max
+
+    def as_dict(self) -> Dict[str, object]:
+        return {
+            "count": self.count,
+            "total_s": self.total,
+            "mean_s": self.total / self.count if self.count else 0.0,
+            "min_s": self.min if self.count else 0.0,
+            "max_s": self.max,
+            "p50_s": self.quantile(0.5),
+            "p95_s": self.quantile(0.95),
+            "buckets_upper_s": [self.BASE_S * 2 ** b for b in range(self.BUCKETS)],
+            "buckets": self.counts,
+        }
+
+
+class StageMetrics:
+    """
+    Zbiera pomiary etapów (extract, parse, enrich, fill, generate) dla jednej partii plików:
+    bieżące histogramy per etap (pełne dane), próbka zdarzeń per plik i eksport do JSON/CSV.
+
+    Pamięć nie rośnie z liczbą plików: events to losowa próbka (reservoir sampling) najwyżej
+    MAX_EVENTS zdarzeń, event_count - liczba wszystkich zdarzeń. Dokładne zdarzenia wszystkich
+    plików trafiają do hooków (IMetricsHook.on_stage).
+    """
+
+    STAGES = ("extract", "parse", "enrich", "fill", "generate")
+    FIELDS = ("file", "stage", "wall_s", "cpu_s", "rss_delta")
+    # Górny limit próbki zdarzeń trzymanej w pamięci i eksportowanej do JSON/CSV
+    MAX_EVENTS = 10000
+
+    def __init__(self, hooks: Iterable[IMetricsHook] = ()):
+        self.hooks = list(hooks)
+        self.events: List[Dict[str, object]] = []
+        self.event_count = 0
+        self._random = random.Random(0)
+        self.histograms: Dict[str, Histogram] = {stage: Histogram() for stage in self.STAGES}
+        self.cpu_s: Dict[str, float] = {stage: 0.0 for stage in self.STAGES}
+        self.started = time.time()
+
+    def record(self, file_name: str, stage: str, values: Dict[str, float]) -> None:
+        event = {"file": file_name, "stage": stage, **values}
+        self.event_count += 1
+        if len(self.events) < self.MAX_EVENTS:
+            self.events.append(event)
+        else:
+            slot = self._random.randrange(self.event_count)
+            if slot < self.MAX_EVENTS:
+                self.events[slot] = event
+        self.histograms.setdefault(stage, Histogram()).add(values["wall_s"])
+        self.cpu_s[stage] = self.cpu_s.get(stage, 0.0) + values["cpu_s"]
+        for hook in self.hooks:
+            hook.on_stage(file_name, stage, values)
+
+    def summary(self) -> Dict[str, object]:
+        return {
+            "started": self.started,
+            "finished": time.time(),
+            "events_total": self.event_count,
+            "events_sampled": len(self.events),
+            "stages": {
+                stage: {**histogram.as_dict(), "cpu_total_s": self.cpu_s.get(stage, 0.0)}
+                for stage, histogram in self.histograms.items()
+            },
+        }
+
+    def finish(self, output_dir: Optional[Path] = None) -> Dict[str, object]:
+        """Koniec partii: przekazuje podsumowanie do hooków i opcjonalnie zapisuje JSON + CSV"""
+        summary = self.summary()
+        for hook in self.hooks:
+            hook.on_batch_end(summary)
+
+        if output_dir is not None:
+            output_dir = Path(output_dir)
+            output_dir.mkdir(parents=True, exist_ok=True)
+            stamp = time.strftime("%Y%m%d_%H%M%S", time.localtime(self.started))
+            self.export_json(output_dir / f"metrics_{stamp}.json", summary)
+            self.export_csv(output_dir / f"metrics_{stamp}.csv")
+            print(f"📈 Metryki zapisane w: {output_dir}")
+        return summary
+
+    def export_json(self, path: Path, summary: Optional[Dict[str, object]] = None) -> None:
+        payload = {"summary": summary or self.summary(), "events": self.events}
+        Path(path).write_text(json.dumps(payload, indent=2, ensure_ascii=False), encoding="utf-8")
+
+    def export_csv(self, path: Path) -> None:
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=self.FIELDS)
+            writer.writeheader()
+            writer.writerows(self.events)
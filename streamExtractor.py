@@ -0,0 +1,188 @@
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional, List, Tuple, Dict, Iterator
+
+from interface import ITextExtractor, IDataParser
+
+
+class ContentStreamTextExtractor(ITextExtractor):
+    """
+    Lekka ekstrakcja tekstu: odczyt operatorów tekstowych (Tj/TJ/'/") wprost ze strumieni treści,
+    bez budowania obiektów znaków i analizy układu jak w pdfplumber.
+    Linie składane są po pozycji Y macierzy tekstu.
+
+    Jeśli wynik nie przejdzie kontroli pokrycia pól (za mało pól PDFData da się z niego odczytać),
+    tekst jest wyciągany ponownie przez PDFTextExtractor (pdfplumber).
+    iter_pages sprawdza pokrycie narastająco po każdej stronie - przy wczesnym przerwaniu
+    (streaming) reszta dokumentu nie jest dekodowana.
+    """
+
+    # Zmień przy każdej zmianie sposobu składania tekstu - unieważnia wpisy w PDFCache
+    VERSION = "1"
+    # Opcje wpływające na wynik - część klucza PDFCache
+    CACHE_OPTIONS = ("max_pages", "min_coverage", "data_parser", "fallback")
+
+    # Przesunięcie w TJ (w tysięcznych em), od którego wstawiamy spację
+    SPACE_THRESHOLD = 200
+    # Tolerancja [pt] przy grupowaniu fragmentów w jedną linię
+    LINE_TOLERANCE = 1.0
+
+    def __init__(
+            self,
+            max_pages: Optional[int] = None,
+            min_coverage: float = 0.9,
+            data_parser: Optional[IDataParser] = None,
+            fallback: Optional[ITextExtractor] = None,
+            low_memory: bool = False,
+            max_rss_mb: Optional[float] = None
+    ):
+        """
+        Args:
+            max_pages: Opcjonalny limit stron
+            min_coverage: Minimalny udział wypełnionych pól PDFData (0-1), poniżej → fallback
+            data_parser: Parser używany do kontroli pokrycia (domyślnie SinglePassDataParser)
+            fallback: Ekstraktor zapasowy (domyślnie PDFTextExtractor)
+            low_memory: Przekazywane do domyślnego fallbacku (strony strumieni i tak nie są trzymane)
+            max_rss_mb: Limit przyrostu pamięci na jeden plik - po przekroczeniu MemoryLimitExceeded
+        """
+        from model import PDFTextExtractor, SinglePassDataParser
+
+        self.max_pages = max_pages
+        self.min_coverage = min_coverage
+        self.data_parser = data_parser or SinglePassDataParser()
+        self.max_rss_mb = max_rss_mb
+        self.fallback = fallback or PDFTextExtractor(max_pages, low_memory=low_memory, max_rss_mb=max_rss_mb)
+        self.fallback_count = 0
+
+    def extract_text(self, file_path: Path) -> str:
+        text = "\n".join(self.iter_raw_pages(file_path))
+        if self.coverage(text) >= self.min_coverage:
+            return text
+
+        self.fallback_count += 1
+        print(f"  ℹ {Path(file_path).name}: za mało pól z odczytu strumieni - ekstrakcja przez pdfplumber")
+        return self.fallback.extract_text(file_path)
+
+    def iter_pages(self, file_path: Path) -> Iterator[str]:
+        """
+        Strony ze strumieni treści, leniwie. Każda strona jest parsowana raz, a pokrycie pól liczone
+        narastająco. Gdy strumienie się skończą, a pokrycie jest za małe, dalej idą strony z fallbacku
+        (pola odczytane już ze strumieni mają pierwszeństwo, fallback uzupełnia brakujące).
+        """
+        from model import merge_missing, parse_page
+
+        data = self.data_parser.parse("")
+        for page_text in self.iter_raw_pages(file_path):
+            merge_missing(data, parse_page(self.data_parser, page_text))
+            yield page_text
+
+        if self._coverage(data) >= self.min_coverage:
+            return
+
+        self.fallback_count += 1
+        print(f"  ℹ {Path(file_path).name}: za mało pól z odczytu strumieni - strony przez pdfplumber")
+        yield from self.fallback.iter_pages(file_path)
+
+    def coverage(self, text: str) -> float:
+        """Udział pól PDFData, które parser odczytuje z tekstu"""
+        return self._coverage(self.data_parser.parse(text))
+
+    @staticmethod
+    def _coverage(data) -> float:
+        total = len(data.to_dict()) - len(("prepared_by", "thickness1", "thickness2"))
+        return 1 - len(data.missing_fields()) / total
+
+    def iter_raw_pages(self, file_path: Path):
+        """Tekst kolejnych stron odczytany bezpośrednio ze strumieni treści (bez fallbacku)"""
+        from pdfminer.pdfdocument import PDFDocument
+        from pdfminer.pdfinterp import PDFResourceManager, PDFPageInterpreter
+        from pdfminer.pdfpage import PDFPage
+        from pdfminer.pdfparser import PDFParser
+        from model import RSSLimit
+
+        limit = RSSLimit(file_path, self.max_rss_mb) if self.max_rss_mb else None
+        with open(file_path, "rb") as f:
+            document = PDFDocument(PDFParser(f))
+            resources = PDFResourceManager(caching=True)
+            device = _device_class()(resources, self.SPACE_THRESHOLD)
+            interpreter = PDFPageInterpreter(resources, device)
+
+            for number, page in enumerate(PDFPage.create_pages(document)):
+                if self.max_pages is not None and number >= self.max_pages:
+                    break
+                device.runs = []
+                interpreter.process_page(page)
+                page_text = self._join_lines(device.runs)
+                if limit is not None:
+                    limit.check(number + 1)
+                if page_text:
+                    yield page_text
+
+    def _join_lines(self, runs: List[Tuple[float, float, str]]) -> str:
+        """Fragmenty (y, x, tekst) → linie od góry strony, w linii od lewej"""
+        lines: Dict[float, List[Tuple[float, str]]] = {}
+        line_keys: List[float] = []
+        for y, x, text in runs:
+            key = next((k for k in line_keys if abs(k - y) <= self.LINE_TOLERANCE), None)
+            if key is None:
+                key = y
+                line_keys.append(key)
+                lines[key] = []
+            lines[key].append((x, text))
+
+        result = []
+        for key in sorted(line_keys, reverse=True):
+            parts = [text for _, text in sorted(lines[key], key=lambda part: part[0])]
+            line = " ".join(part.strip() for part in parts if part.strip())
+            if line:
+                result.append(line)
+        return "\n".join(result)
+
+
+@lru_cache(maxsize=None)
+def _device_class():
+    """Klasa urządzenia pdfminer tworzona leniwie - pdfminer importowany dopiero przy użyciu"""
+    from pdfminer.pdfdevice import PDFDevice
+    from pdfminer.pdffont import PDFUnicodeNotDefined
+    from pdfminer.utils import apply_matrix_pt, mult_matrix
+
+    class TextRunDevice(PDFDevice):
+        """Zbiera fragmenty tekstu (y, x, tekst) z operatorów Tj/TJ bez analizy układu"""
+
+        def __init__(self, rsrcmgr, space_threshold: float):
+            super().__init__(rsrcmgr)
+            self.space_threshold = space_threshold
+            self.runs: List[Tuple[float, float, str]] = []
+            self._last_position = None
+
+        def render_string(self, textstate, seq, ncs, graphicstate) -> None:
+            font = textstate.font
+            if font is None:
+                return
+
+            matrix = mult_matrix(textstate.matrix, self.ctm) if self.ctm else textstate.matrix
+            x, y = apply_matrix_pt(matrix, (0, 0))
+
+            chars = []
+            for item in seq:
+                if isinstance(item, (int, float)):
+                    if -item > self.space_threshold:
+                        chars.append(" ")
+                    continue
+                for cid in font.decode(item):
+                    try:
+                        chars.append(font.to_unichr(cid))
+                    except (PDFUnicodeNotDefined, KeyError):
+                        pass
+            text = "".join(chars)
+
+            # Kolejne Tj bez przesunięcia macierzy doklejamy do poprzedniego fragmentu
+            if self.runs and self._last_position == (x, y):
+                last_y, last_x, last_text = self.runs[-1]
+                self.runs[-1] = (last_y, last_x, last_text + text)
+            else:
+                self.runs.append((y, x, text))
+            self._last_position = (x, y)
+
+    return TextRunDevice
+
@@ -0,0 +1,340 @@
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing.connection import wait
+from typing import Callable, Deque, List, Optional, Tuple
+
+
+class WorkerTimeout(TimeoutError):
+    """Plik przetwarzany dłużej niż limit czasu - proces roboczy został zabity"""
+
+
+class WorkerMemoryExceeded(MemoryError):
+    """Proces roboczy przekroczył limit pamięci - został zabity"""
+
+
+class WorkerCrashed(RuntimeError):
+    """Proces roboczy zakończył się w trakcie pliku (np. segfault, OOM killer)"""
+
+
+def process_rss(pid: int) -> int:
+    """RSS innego procesu w bajtach (psutil → /proc → 0, gdy nieznane)"""
+    try:
+        import psutil
+        return psutil.Process(pid).memory_info().rss
+    except ImportError:
+        pass
+    except Exception:
+        return 0
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return 0
+
+
+def memory_limit_supported() -> bool:
+    """Czy limit pamięci procesu roboczego da się egzekwować: pomiar RSS (psutil, /proc) lub RLIMIT_AS (POSIX)"""
+    try:
+        import psutil  # noqa: F401
+        return True
+    except ImportError:
+        pass
+    if os.path.exists("/proc/self/statm"):
+        return True
+    try:
+        import resource  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def _limit_address_space(max_memory_mb: Optional[float]) -> None:
+    """
+    Twardy limit pamięci w procesie roboczym (tylko POSIX): bieżąca pamięć wirtualna + max_memory_mb.
+    Alokacja ponad limit kończy się MemoryError w dziecku, zanim nadzorca zdąży zmierzyć RSS.
+    """
+    if not max_memory_mb:
+        return
+    try:
+        import resource
+        with open("/proc/self/statm") as f:
+            virtual = int(f.read().split()[0]) * os.sysconf("SC_PAGE_SIZE")
+        limit = virtual + int(max_memory_mb * 1024 * 1024)
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    except (ImportError, OSError, ValueError, AttributeError):
+        pass  # bez twardego limitu zostaje pomiar RSS po stronie nadzorcy
+
+
+def _worker_main(conn, max_memory_mb: Optional[float], initializer: Optional[Callable]) -> None:
+    """Pętla procesu roboczego: (funkcja, argumenty) → ("ok", wynik) / ("error", wyjątek)"""
+    from model import MemoryLimitExceeded
+
+    if initializer is not None:
+        initializer()
+    _limit_address_space(max_memory_mb)
+    while True:
+        try:
+            task = conn.recv()
+        except (EOFError, OSError, KeyboardInterrupt):
+            return
+        if task is None:
+            return
+
+        fn, args = task
+        try:
+            conn.send(("ok", fn(*args)))
+        except MemoryLimitExceeded as e:
+            # Miękki limit na plik (max_rss_mb) - zwykły błąd pliku, proces zostaje
+            conn.send(("error", e))
+        except MemoryError:
+            # Po MemoryError stan procesu jest niepewny - odpowiedź i wymiana na nowy proces
+            limit = f" (limit {max_memory_mb:g} MB)" if max_memory_mb else ""
+            conn.send(("error", WorkerMemoryExceeded(f"brak pamięci w procesie roboczym{limit}")))
+            return
+        except Exception as e:
+            # Zawsze opis zamiast oryginału: wyjątek, który da się zapiklować, nie musi dać się
+            # odtworzyć u nadzorcy (np. __init__ z dodatkowymi argumentami)
+            conn.send(("error", RuntimeError(f"{type(e).__name__}: {e}")))
+
+
+class _Worker:
+    """Jeden proces roboczy z własnym łączem; task = (future, start, nazwa) gdy zajęty"""
+
+    def __init__(self, context, max_memory_mb: Optional[float], initializer: Optional[Callable] = None):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=_worker_main, args=(child_conn, max_memory_mb, initializer), daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+        self.task: Optional[Tuple[Future, float, str]] = None
+
+    def kill(self) -> None:
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join(timeout=5)
+        self.conn.close()
+
+    def stop(self) -> None:
+        """Łagodne zamknięcie bezczynnego procesu (kill po chwili, jeśli nie wyszedł)"""
+        try:
+            self.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self.process.join(timeout=1)
+        self.kill()
+
+
+class SupervisedExecutor:
+    """
+    Pula nadzorowanych procesów roboczych - odpowiednik ProcessPoolExecutor.submit/result
+    z limitem czasu i pamięci na jedno zadanie (jeden plik PDF).
+
+    Wątek nadzorcy przydziela zadania wolnym procesom i co POLL_S sprawdza zajęte:
+    - zadanie dłuższe niż timeout_s → proces zabity, future kończy się WorkerTimeout,
+    - RSS procesu ponad max_memory_mb → proces zabity, WorkerMemoryExceeded
+      (na POSIX dodatkowo twardy RLIMIT_AS w dziecku → MemoryError zgłoszony normalnie),
+    - proces zakończony w trakcie zadania → WorkerCrashed z kodem wyjścia.
+    Błąd samego wątku nadzorcy → wszystkie zadania kończą się BrokenProcessPool, a pula jest
+    oznaczona jako zepsuta (submit też zgłasza BrokenProcessPool) - jak w ProcessPoolExecutor.
+    Zabity proces od razu zastępuje nowy, więc pojedynczy zepsuty plik nie blokuje partii
+    dłużej niż timeout_s.
+
+    Użycie:
+        with SupervisedExecutor(4, timeout_s=60, max_memory_mb=1024) as pool:
+            future = pool.submit(extract_and_parse, extractor, parser, pdf_path, True, None)
+            data, timings = future.result()
+    """
+
+    # Odstęp sprawdzania czasu i pamięci zajętych procesów [s]
+    POLL_S = 0.1
+
+    def __init__(self, max_workers: int = 1, timeout_s: Optional[float] = None,
+                 max_memory_mb: Optional[float] = None, initializer: Optional[Callable] = None):
+        """
+        Args:
+            max_workers: Liczba procesów roboczych
+            timeout_s: Limit czasu zegarowego na jedno zadanie (None = bez limitu)
+            max_memory_mb: Limit pamięci procesu roboczego (None = bez limitu)
+            initializer: Funkcja wywoływana raz na starcie każdego procesu (jak w ProcessPoolExecutor)
+        """
+        self.max_workers = max(max_workers, 1)
+        self.timeout_s = timeout_s
+        self.max_memory_mb = max_memory_mb
+        self.initializer = initializer
+        self.restarts = 0
+        if max_memory_mb and not memory_limit_supported():
+            print(f"⚠ Limit pamięci procesu roboczego ({max_memory_mb:g} MB) nie będzie egzekwowany - "
+                  f"brak psutil, a RLIMIT_AS działa tylko na POSIX (pip install psutil)")
+
+        self._context = multiprocessing.get_context()
+        self._workers: List[_Worker] = []
+        self._pending: Deque[Tuple[Future, Callable, tuple]] = deque()
+        self._lock = threading.Lock()
+        self._wakeup_read, self._wakeup_write = self._context.Pipe(duplex=False)
+        self._shutdown = False
+        self._broken: Optional[str] = None
+        self._thread = threading.Thread(target=self._supervise, name="pdf-supervisor", daemon=True)
+        self._thread.start()
+
+    def __enter__(self) -> "SupervisedExecutor":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.shutdown()
+
+    def submit(self, fn: Callable, *args) -> Future:
+        future: Future = Future()
+        with self._lock:
+            if self._broken is not None:
+                raise BrokenProcessPool(self._broken)
+            if self._shutdown:
+                raise RuntimeError("SupervisedExecutor jest zamknięty")
+            self._pending.append((future, fn, args))
+        self._wakeup()
+        return future
+
+    def shutdown(self, wait: bool = True, cancel_futures: bool = True) -> None:
+        """
+        Zamyka pulę: zadania oczekujące są anulowane, procesy zatrzymane (zajęte - zabite).
+        Argumenty jak w ProcessPoolExecutor.shutdown - tu zawsze anuluje i czeka na wątek nadzorcy.
+        """
+        with self._lock:
+            if self._shutdown:
+                return
+            self._shutdown = True
+        self._wakeup()
+        self._thread.join()
+        self._wakeup_read.close()
+        self._wakeup_write.close()
+
+    # ------------------------------------------------------------------ wątek nadzorcy
+
+    def _wakeup(self) -> None:
+        try:
+            self._wakeup_write.send_bytes(b"")
+        except (OSError, ValueError):
+            pass
+
+    def _supervise(self) -> None:
+        try:
+            while not self._shutdown:
+                self._assign()
+                busy = {worker.conn: worker for worker in self._workers if worker.task is not None}
+                for ready in wait(list(busy) + [self._wakeup_read], timeout=self.POLL_S):
+                    if ready is self._wakeup_read:
+                        self._wakeup_read.recv_bytes()
+                    else:
+                        self._receive(busy[ready])
+                self._check_limits()
+        except BaseException as e:
+            with self._lock:
+                self._broken = f"nadzorca puli zakończył się błędem: {type(e).__name__}: {e}"
+        finally:
+            self._stop_all()
+
+    def _assign(self) -> None:
+        """Zadania oczekujące → wolne procesy (brakujące procesy są uruchamiane na żądanie)"""
+        with self._lock:
+            while self._pending:
+                worker = next((w for w in self._workers if w.task is None), None)
+                if worker is None:
+                    if len(self._workers) >= self.max_workers:
+                        return
+                    worker = _Worker(self._context, self.max_memory_mb, self.initializer)
+                    self._workers.append(worker)
+
+                future, fn, args = self._pending.popleft()
+                if not future.set_running_or_notify_cancel():
+                    continue
+                try:
+                    worker.conn.send((fn, args))
+                except Exception as e:
+                    future.set_exception(e)
+                    continue
+                worker.task = (future, time.perf_counter(), self._describe(args))
+
+    def _receive(self, worker: _Worker) -> None:
+        future, _, name = worker.task
+        try:
+            status, payload = worker.conn.recv()
+        except (EOFError, OSError):
+            worker.process.join(timeout=1)
+            self._replace(worker, WorkerCrashed(
+                f"{name}: proces roboczy zakończył się w trakcie pliku (kod {worker.process.exitcode})"
+            ))
+            return
+        except Exception as e:
+            # Odpowiedź odczytana w całości, ale nie dała się odtworzyć (unpickle) - błąd tylko tego zadania
+            worker.task = None
+            future.set_exception(RuntimeError(f"{name}: nie można odczytać wyniku ({type(e).__name__}: {e})"))
+            return
+
+        worker.task = None
+        if status == "ok":
+            future.set_result(payload)
+        else:
+            future.set_exception(payload)
+        if isinstance(payload, WorkerMemoryExceeded):
+            self._replace(worker, None)  # dziecko samo kończy pracę po MemoryError
+
+    def _check_limits(self) -> None:
+        now = time.perf_counter()
+        for worker in list(self._workers):
+            if worker.task is None:
+                if not worker.process.is_alive():
+                    self._replace(worker, None)
+                continue
+
+            _, started, name = worker.task
+            if self.timeout_s is not None and now - started > self.timeout_s:
+                self._replace(worker, WorkerTimeout(f"{name}: przekroczono limit czasu {self.timeout_s:g} s"))
+            elif self.max_memory_mb:
+                rss = process_rss(worker.process.pid)
+                if rss > self.max_memory_mb * 1024 * 1024:
+                    self._replace(worker, WorkerMemoryExceeded(
+                        f"{name}: {rss / 2 ** 20:.0f} MB RSS procesu roboczego "
+                        f"(limit {self.max_memory_mb:g} MB)"
+                    ))
+
+    def _replace(self, worker: _Worker, error: Optional[Exception]) -> None:
+        """Zabija proces; zadanie w toku kończy się błędem, nowy proces powstanie w _assign"""
+        worker.kill()
+        if worker.task is not None and error is not None:
+            worker.task[0].set_exception(error)
+        worker.task = None
+        self._workers.remove(worker)
+        self.restarts += 1
+
+    def _stop_all(self) -> None:
+        with self._lock:
+            pending, self._pending = self._pending, deque()
+        for future, _, _ in pending:
+            if self._broken is None:
+                future.cancel()
+            elif not future.done():
+                future.set_exception(BrokenProcessPool(self._broken))
+        for worker in self._workers:
+            if worker.task is not None:
+                future = worker.task[0]
+                if not future.done():
+                    future.set_exception(BrokenProcessPool(self._broken) if self._broken is not None
+                                         else WorkerCrashed("pula zamknięta w trakcie pliku"))
+                worker.kill()
+            else:
+                worker.stop()
+        self._workers = []
+
+    @staticmethod
+    def _describe(args: tuple) -> str:
+        """Nazwa pliku do komunikatów - pierwszy argument będący ścieżką"""
+        for arg in args:
+            if isinstance(arg, os.PathLike):
+                return os.path.basename(arg)
+        return "zadanie"
+
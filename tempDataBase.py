@@ -1,4 +1,5 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, fields
+from typing import List, Dict, Any
 
 
 @dataclass
@@ -34,3 +35,21 @@ class PDFData:
 
     # Metadata
     prepared_by: str = ""
+
+    def missing_fields(self) -> List[str]:
+        """Pola, których nie udało się jeszcze wypełnić (bez metadanych)"""
+        return [
+            f.name for f in fields(self)
+            if f.name != "prepared_by" and getattr(self, f.name) in ("", None)
+        ]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Wszystkie atrybuty, także dopisane przez parser (np. thickness1/thickness2)"""
+        return dict(vars(self))
+
+    @classmethod
+    def from_dict(cls, values: Dict[str, Any]) -> "PDFData":
+        data = cls()
+        for name, value in values.items():
+            setattr(data, name, value)
+        return data